@@ -4,35 +4,69 @@ Web GUI for Universal Web Scraper & Downloader
 Flask-based web interface
 """
 
-from flask import Flask, render_template, request, jsonify, send_file, Response
+from flask import Flask, render_template, request, jsonify, Response
 import os
 import json
-import zipfile
-from io import BytesIO
-from scraper import LinkScraper
-from downloader import FileDownloader
+import shutil
 import threading
+import time
+from archive import iter_zip
+from scraper import LinkScraper
+from throttle import RateLimiter
+from page_cache import PageCache
+from seen import make_seen_set
+from probe import ProbeCache
+from scrape_cache import ScrapeCache, scrape_cache_key
+from jobs import DownloadJob, JobStore, ScrapeJob, TransferStats
+from events import ProgressThrottle
+from scheduler import DownloadScheduler, QueueFullError
+from concurrent.futures import ThreadPoolExecutor
 import uuid
 
 app = Flask(__name__)
 app.config['SECRET_KEY'] = 'your-secret-key-here'
-
-# Store active jobs
-active_jobs = {}
-
-
-class DownloadJob:
-    """Represents a download job"""
-
-    def __init__(self, job_id: str):
-        self.job_id = job_id
-        self.status = "pending"  # pending, scraping, downloading, completed, failed
-        self.links = []
-        self.progress = 0
-        self.total = 0
-        self.current_file = ""
-        self.output_dir = f"downloads/{job_id}"
-        self.error = None
+app.config['PAGE_CACHE_PATH'] = os.environ.get('PAGE_CACHE_PATH')
+app.config['SEEN_BACKEND'] = os.environ.get('SEEN_BACKEND', 'memory')
+app.config['PROBE_CACHE_PATH'] = os.environ.get('PROBE_CACHE_PATH')
+app.config['JOB_STORE_PATH'] = os.environ.get('JOB_STORE_PATH')
+app.config['DOWNLOAD_WORKERS'] = int(os.environ.get('DOWNLOAD_WORKERS', 8))
+app.config['MAX_QUEUED_FILES'] = int(os.environ.get('MAX_QUEUED_FILES', 20000))
+app.config['MAX_DOWNLOAD_JOBS'] = int(os.environ.get('MAX_DOWNLOAD_JOBS', 100))
+app.config['DOWNLOAD_MAX_PER_HOST'] = int(os.environ.get('DOWNLOAD_MAX_PER_HOST', 4))
+app.config['SCRAPE_WORKERS'] = int(os.environ.get('SCRAPE_WORKERS', 4))
+app.config['MAX_SCRAPE_WORKERS'] = int(os.environ.get('MAX_SCRAPE_WORKERS', 16))
+app.config['SCRAPE_CACHE_PATH'] = os.environ.get('SCRAPE_CACHE_PATH')
+app.config['SCRAPE_CACHE_TTL'] = float(os.environ.get('SCRAPE_CACHE_TTL', 600))
+
+# Download jobs; finished ones are evicted after a while, and with a
+# JOB_STORE_PATH unfinished ones survive restarts
+jobs = JobStore(path=app.config['JOB_STORE_PATH'])
+
+# Shared by all download jobs that don't ask for their own limits, so
+# concurrent jobs hitting the same origin are paced together
+download_rate_limiter = RateLimiter(rate=1 / 0.3)
+
+# One pool of download workers shared fairly by all jobs; its per-host
+# connection cap holds across jobs
+download_scheduler = DownloadScheduler(num_workers=app.config['DOWNLOAD_WORKERS'],
+                                       max_queued_files=app.config['MAX_QUEUED_FILES'],
+                                       max_jobs=app.config['MAX_DOWNLOAD_JOBS'],
+                                       max_per_host=app.config['DOWNLOAD_MAX_PER_HOST'],
+                                       rate_limiter=download_rate_limiter)
+
+# Background scrapes (POST /api/scrape with "async": true); results are kept
+# in memory for an hour
+scrape_jobs = JobStore(max_finished=50, finished_ttl=3600)
+scrape_executor = ThreadPoolExecutor(max_workers=app.config['SCRAPE_WORKERS'])
+
+# Results of recent scrapes, so repeated identical requests return at once
+scrape_cache = ScrapeCache(ttl=app.config['SCRAPE_CACHE_TTL'], path=app.config['SCRAPE_CACHE_PATH'])
+
+# Optional on-disk cache so repeated scrapes of unchanged pages become 304s
+page_cache = PageCache(app.config['PAGE_CACHE_PATH']) if app.config['PAGE_CACHE_PATH'] else None
+
+# Results of HEAD probes of extensionless links, shared by all scrapes
+probe_cache = ProbeCache(path=app.config['PROBE_CACHE_PATH'])
 
 
 @app.route('/')
@@ -43,7 +77,16 @@ def index():
 
 @app.route('/api/scrape', methods=['POST'])
 def scrape():
-    """API endpoint to scrape a webpage"""
+    """
+    API endpoint to scrape a webpage
+
+    With "async": true the scrape runs in the background and the response
+    only carries its job_id; links are then read from /api/scrape/<job_id>
+    (partial results) or streamed from its /events (SSE) or /links.ndjson.
+
+    Results are cached by their scrape parameters for SCRAPE_CACHE_TTL
+    seconds; "refresh": true scrapes again and replaces the cached result.
+    """
     data = request.json
 
     url = data.get('url')
@@ -51,57 +94,288 @@ def scrape():
         return jsonify({'error': 'URL is required'}), 400
 
     try:
-        scraper = LinkScraper(base_url=url)
-
-        # Handle pagination
-        pagination_mode = data.get('pagination_mode', 'single')
-        links = []
-
-        if pagination_mode == 'single':
-            links = scraper.scrape_page(url)
-
-        elif pagination_mode == 'auto':
-            page_urls = scraper.auto_detect_pagination(url)
-            for page_url in page_urls:
-                links.extend(scraper.scrape_page(page_url))
+        scraper = scraper_from_request(data)
+        if data.get('pagination_mode') == 'crawl':
+            crawl_options_from_request(data)
+        cache_key = scrape_cache_key(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    cached = None if data.get('refresh') else scrape_cache.get(cache_key)
+
+    if data.get('async'):
+        job = ScrapeJob(str(uuid.uuid4()), url)
+        scrape_jobs.add(job)
+        if cached is not None:
+            job.cached = True
+            job.add_links(cached)
+            job.finish("completed")
+        else:
+            scrape_executor.submit(run_scrape_job, job, scraper, data, cache_key)
+        return jsonify({'success': True, 'job_id': job.job_id, 'cached': job.cached}), 202
+
+    if cached is not None:
+        return jsonify({
+            'success': True,
+            'links': cached,
+            'count': len(cached),
+            'statistics': link_statistics(cached),
+            'cached': True
+        })
 
-        elif pagination_mode == 'manual':
-            pattern = data.get('url_pattern', url)
-            page_range = data.get('page_range', '1')
-            page_numbers = parse_page_range(page_range)
-            links = scraper.scrape_multiple_pages(pattern, page_numbers)
+    try:
+        links = run_scrape(scraper, data)
 
         # Filter by extensions if specified
-        extensions = data.get('extensions', [])
-        if extensions:
-            extensions_set = {ext.lower().replace('.', '') for ext in extensions}
+        extensions_set = requested_extensions(data)
+        if extensions_set:
             links = [link for link in links if link['extension'] in extensions_set]
 
-        # Remove duplicates
-        seen = set()
-        unique_links = []
-        for link in links:
-            if link['url'] not in seen:
-                seen.add(link['url'])
-                unique_links.append(link)
-
-        # Get statistics
-        stats = {}
-        for link in unique_links:
-            ext = link['extension']
-            stats[ext] = stats.get(ext, 0) + 1
+        if cacheable(scraper, links):
+            scrape_cache.put(cache_key, links)
 
         return jsonify({
             'success': True,
-            'links': unique_links,
-            'count': len(unique_links),
-            'statistics': stats
+            'links': links,
+            'count': len(links),
+            'statistics': link_statistics(links),
+            'cached': False
         })
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/scrape-cache')
+def get_scrape_cache_stats():
+    """Hit/miss counters of this server process's scrape result cache"""
+    return jsonify(scrape_cache.stats())
+
+
+@app.route('/api/scrape/<job_id>')
+def get_scrape_job(job_id):
+    """Status and links found so far of a background scrape (?offset=N&limit=M)"""
+    job = scrape_jobs.get(job_id)
+
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+        limit = int(request.args['limit']) if 'limit' in request.args else None
+    except ValueError:
+        return jsonify({'error': 'Invalid offset or limit'}), 400
+
+    # Read the status first so a finished job never misses its last links
+    status = scrape_status(job)
+    links = job.links[offset:offset + limit if limit is not None else None]
+    status.update({'links': links, 'offset': offset, 'next_offset': offset + len(links)})
+    return jsonify(status)
+
+
+@app.route('/api/scrape/<job_id>/events')
+def scrape_events(job_id):
+    """
+    Stream the links of a background scrape as Server-Sent Events
+
+    Each 'links' event carries the links of one page; its ID is the number of
+    links sent so far, so a reconnecting client resumes where it left off.
+    """
+    job = scrape_jobs.get(job_id)
+
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    try:
+        offset = int(request.headers.get('Last-Event-ID', 0))
+    except ValueError:
+        offset = 0
+
+    def generate():
+        yield sse_message('status', scrape_status(job))
+
+        sent = offset
+        for batch in job.follow(offset):
+            if batch is None:
+                yield ': keepalive\n\n'
+            else:
+                yield sse_message('links', {'offset': sent, 'links': batch}, sent + len(batch))
+                sent += len(batch)
+
+        yield sse_message('complete', dict(scrape_status(job), statistics=link_statistics(job.links)))
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/scrape/<job_id>/links.ndjson')
+def scrape_links_ndjson(job_id):
+    """
+    Stream the links of a background scrape as newline-delimited JSON
+
+    One link per line as pages finish (from ?offset=N on); the last line is
+    the job status with 'count' and 'statistics'.
+    """
+    job = scrape_jobs.get(job_id)
+
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+    except ValueError:
+        return jsonify({'error': 'Invalid offset'}), 400
+
+    def generate():
+        for batch in job.follow(offset):
+            # Blank lines keep idle connections open and are skipped by NDJSON readers
+            if batch is None:
+                yield '\n'
+            else:
+                yield ''.join(json.dumps(link) + '\n' for link in batch)
+
+        yield json.dumps(dict(scrape_status(job), statistics=link_statistics(job.links))) + '\n'
+
+    return Response(generate(), mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def scraper_from_request(data: dict) -> LinkScraper:
+    """
+    Build the LinkScraper for a scrape request
+
+    The requested number of workers is capped at MAX_SCRAPE_WORKERS.
+
+    Raises:
+        ValueError: If the workers or rate limit fields are invalid
+    """
+    try:
+        workers = int(data.get('workers', 4))
+    except (TypeError, ValueError):
+        raise ValueError('Invalid workers')
+    if workers < 1:
+        raise ValueError('workers must be at least 1')
+    workers = min(workers, app.config['MAX_SCRAPE_WORKERS'])
+
+    return LinkScraper(base_url=data['url'], max_workers=workers,
+                       rate_limiter=rate_limiter_from_request(data), page_cache=page_cache,
+                       seen_backend=app.config['SEEN_BACKEND'],
+                       probe=bool(data.get('probe')), probe_cache=probe_cache)
+
+
+def crawl_options_from_request(data: dict) -> dict:
+    """
+    Read the crawl mode's options from a scrape request
+
+    Raises:
+        ValueError: If max_depth, max_pages or scope is invalid
+    """
+    try:
+        max_depth = int(data.get('max_depth', 2))
+        max_pages = int(data.get('max_pages', 200))
+    except (TypeError, ValueError):
+        raise ValueError('Invalid max_depth or max_pages')
+    if max_depth < 0:
+        raise ValueError('max_depth must be at least 0')
+    if max_pages < 1:
+        raise ValueError('max_pages must be at least 1')
+
+    scope = data.get('scope', 'domain')
+    if scope not in ('domain', 'path'):
+        raise ValueError(f"Unknown crawl scope '{scope}' (choose from domain, path)")
+
+    return {'max_depth': max_depth, 'max_pages': max_pages, 'scope': scope}
+
+
+def run_scrape(scraper: LinkScraper, data: dict, on_page=None) -> list:
+    """
+    Scrape according to the request's pagination mode
+
+    Args:
+        scraper: Scraper built by scraper_from_request
+        data: Request fields
+        on_page: Optional callback function(page_url, links) run as each page is scraped
+
+    Returns:
+        Links found, before extension filtering
+    """
+    url = data['url']
+    pagination_mode = data.get('pagination_mode', 'single')
+    links = []
+
+    if pagination_mode == 'single':
+        links = scraper.scrape_page(url)
+        if on_page:
+            on_page(url, links)
+
+    elif pagination_mode == 'auto':
+        links = scraper.crawl_pagination(url, on_page=on_page)
+
+    elif pagination_mode == 'manual':
+        pattern = data.get('url_pattern', url)
+        page_range = data.get('page_range', '1')
+        page_numbers = parse_page_range(page_range)
+        links = scraper.scrape_multiple_pages(pattern, page_numbers, on_page=on_page)
+
+    elif pagination_mode == 'crawl':
+        links = list(scraper.crawl_site(url, on_page=on_page, **crawl_options_from_request(data)))
+
+    return links
+
+
+def run_scrape_job(job: ScrapeJob, scraper: LinkScraper, data: dict, cache_key: str):
+    """Run a background scrape, publishing each page's new links as it finishes"""
+    extensions_set = requested_extensions(data)
+    job.status = "scraping"
+
+    with make_seen_set(app.config['SEEN_BACKEND']) as seen:
+        def on_page(page_url, links):
+            job.add_links([link for link in links
+                           if (not extensions_set or link['extension'] in extensions_set)
+                           and seen.add(link['url'])])
+
+        try:
+            run_scrape(scraper, data, on_page)
+            if cacheable(scraper, job.links):
+                scrape_cache.put(cache_key, job.links)
+            job.finish("completed")
+        except Exception as e:
+            print(f"Error in scrape job {job.job_id}: {e}")
+            job.finish("failed", str(e))
+
+
+def cacheable(scraper: LinkScraper, links: list) -> bool:
+    """Only complete, non-empty results are cached; a failed page fetch may be an outage"""
+    return bool(links) and not scraper.fetch_errors
+
+
+def requested_extensions(data: dict) -> set:
+    """Normalized extensions of the request's 'extensions' filter (empty = all)"""
+    return {ext.lower().replace('.', '') for ext in data.get('extensions') or []}
+
+
+def link_statistics(links: list) -> dict:
+    """Number of links per extension"""
+    stats = {}
+    for link in links:
+        ext = link['extension']
+        stats[ext] = stats.get(ext, 0) + 1
+    return stats
+
+
+def scrape_status(job: ScrapeJob) -> dict:
+    """Public status fields of a scrape job"""
+    return {
+        'job_id': job.job_id,
+        'url': job.url,
+        'status': job.status,
+        'pages': job.pages,
+        'count': len(job.links),
+        'cached': job.cached,
+        'error': job.error
+    }
+
+
 @app.route('/api/download', methods=['POST'])
 def download():
     """API endpoint to start download job"""
@@ -110,18 +384,32 @@ def download():
     links = data.get('links', [])
     if not links:
         return jsonify({'error': 'No links provided'}), 400
+    if not isinstance(links, list) or not all(isinstance(link, dict) and isinstance(link.get('url'), str)
+                                              and link['url'] for link in links):
+        return jsonify({'error': 'Every link needs a "url" string'}), 400
+    for link in links:
+        if not isinstance(link.get('text'), str) or not link['text']:
+            link['text'] = link['url']
 
     # Create job
     job_id = str(uuid.uuid4())
     job = DownloadJob(job_id)
     job.links = links
     job.total = len(links)
-    active_jobs[job_id] = job
+    job.rate_config = {key: data[key] for key in ('rate_limit', 'host_rates') if key in data}
+    try:
+        job.rate_limiter = rate_limiter_from_request(data) or download_rate_limiter
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    jobs.add(job)
 
-    # Start download in background thread
-    thread = threading.Thread(target=download_worker, args=(job,))
-    thread.daemon = True
-    thread.start()
+    try:
+        start_download(job)
+    except QueueFullError as e:
+        jobs.remove(job_id)
+        response = jsonify({'error': str(e), 'retry_after': e.retry_after})
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, 429
 
     return jsonify({
         'success': True,
@@ -131,26 +419,82 @@ def download():
 
 @app.route('/api/job/<job_id>')
 def get_job_status(job_id):
-    """Get status of a download job"""
-    job = active_jobs.get(job_id)
+    """Get status of a download job (add ?files=1 for the status of every file)"""
+    job = jobs.get(job_id)
 
     if not job:
         return jsonify({'error': 'Job not found'}), 404
 
-    return jsonify({
-        'job_id': job_id,
+    status = job_status(job)
+    if request.args.get('files'):
+        status['files'] = job.transfer.file_statuses()
+    return jsonify(status)
+
+
+@app.route('/api/job/<job_id>/events')
+def job_events(job_id):
+    """Stream the events of a download job as Server-Sent Events"""
+    job = jobs.get(job_id)
+
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+
+    try:
+        last_id = int(request.headers.get('Last-Event-ID', 0))
+    except ValueError:
+        last_id = 0
+
+    def generate():
+        # Let the client render the current state before the first event
+        yield sse_message('status', job_status(job))
+
+        # Jobs read back from the job store have no live events
+        if job.finished and not job.events.closed:
+            yield sse_message('complete', job_status(job))
+            return
+
+        for entry in job.events.follow(last_id):
+            if entry is None:
+                yield ': keepalive\n\n'
+            else:
+                event_id, event, data = entry
+                yield sse_message(event, data, event_id)
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+def job_status(job: DownloadJob) -> dict:
+    """Public status fields of a download job"""
+    return {
+        'job_id': job.job_id,
         'status': job.status,
         'progress': job.progress,
         'total': job.total,
         'current_file': job.current_file,
-        'error': job.error
-    })
+        'error': job.error,
+        **job_transfer(job)
+    }
+
+
+def job_transfer(job: DownloadJob) -> dict:
+    """Byte-level progress of a download job: bytes, throughput and ETA"""
+    transfer = job.transfer.snapshot(job.total)
+    if job.finished:
+        transfer['eta'] = 0 if job.status == 'completed' else None
+    return transfer
+
+
+def sse_message(event: str, data: dict, event_id: int = None) -> str:
+    """Format one Server-Sent Events message"""
+    message = f'id: {event_id}\n' if event_id is not None else ''
+    return message + f'event: {event}\ndata: {json.dumps(data)}\n\n'
 
 
 @app.route('/api/download-zip/<job_id>')
 def download_zip(job_id):
     """Download all files as a ZIP"""
-    job = active_jobs.get(job_id)
+    job = jobs.get(job_id)
 
     if not job:
         return jsonify({'error': 'Job not found'}), 404
@@ -158,45 +502,108 @@ def download_zip(job_id):
     if job.status != 'completed':
         return jsonify({'error': 'Job not completed yet'}), 400
 
-    # Create ZIP in memory
-    memory_file = BytesIO()
-
-    with zipfile.ZipFile(memory_file, 'w', zipfile.ZIP_DEFLATED) as zf:
-        # Add all downloaded files
-        for filename in os.listdir(job.output_dir):
-            file_path = os.path.join(job.output_dir, filename)
-            if os.path.isfile(file_path):
-                zf.write(file_path, filename)
-
-    memory_file.seek(0)
-
-    return send_file(
-        memory_file,
+    # Stream the archive while it is being built
+    files = []
+    for filename in sorted(os.listdir(job.output_dir)):
+        # Skip the download manifest and unfinished .part files
+        if filename.startswith('.') or filename.endswith(('.part', '.part.meta')):
+            continue
+        file_path = os.path.join(job.output_dir, filename)
+        if os.path.isfile(file_path):
+            files.append((file_path, filename))
+
+    return Response(
+        iter_zip(files),
         mimetype='application/zip',
-        as_attachment=True,
-        download_name=f'download_{job_id}.zip'
+        headers={'Content-Disposition': f'attachment; filename=download_{job_id}.zip'}
     )
 
 
-def download_worker(job: DownloadJob):
-    """Background worker to download files"""
-    try:
-        job.status = "downloading"
+def start_download(job: DownloadJob, force: bool = False):
+    """
+    Queue a job's files on the shared download workers
 
-        downloader = FileDownloader(output_dir=job.output_dir, rate_limit=0.3)
+    Raises:
+        QueueFullError: If the queue is full (unless force is set)
+    """
+    # Reject before the downloader creates the output directory and manifest
+    if not force:
+        download_scheduler.check_capacity(len(job.links))
 
-        for i, link in enumerate(job.links):
-            job.current_file = link['text'][:50]
-            job.progress = i
+    job.progress = 0
+    job.transfer = TransferStats()
+    downloader = download_scheduler.new_downloader(job.output_dir, rate_limiter=job.rate_limiter)
+    throttle = ProgressThrottle()
 
-            downloader.download_file(link['url'])
+    def on_start():
+        job.status = "downloading"
+        jobs.save(job)
+
+    def on_file_start(link):
+        job.transfer.start_file(link['url'], link.get('size'))
+        job.events.publish('started', {'url': link['url'], 'text': link['text']})
+
+    def on_progress(link, current, total):
+        transfer = job.transfer.files.get(link['url'])
+        if transfer is not None:
+            transfer.update(current, total)
+        if throttle.ready(link['url'], final=bool(total) and current >= total):
+            job.events.publish('progress', dict(job_transfer(job), url=link['url'], bytes=current, total=total))
+
+    def on_file(link, result):
+        status = result['status']
+        job.transfer.finish_file(link['url'], status, result.get('size'))
+        job.progress += 1
+        job.current_file = link['text'][:50]
+        job.events.publish('failed' if status == 'failed' else 'done', {
+            'url': link['url'], 'text': link['text'], 'status': status,
+            'progress': job.progress, 'total': job.total, **job_transfer(job)
+        })
 
+    def on_done(results):
         job.progress = job.total
         job.status = "completed"
+        jobs.save(job)
+        job.events.publish('complete', job_status(job))
 
-    except Exception as e:
-        job.status = "failed"
-        job.error = str(e)
+    try:
+        download_scheduler.submit(job.job_id, job.links, downloader,
+                                  on_start=on_start, on_file_start=on_file_start, on_progress=on_progress,
+                                  on_file=on_file, on_done=on_done, force=force)
+    except QueueFullError:
+        # The queue filled up since the check; nothing was downloaded into the new directory
+        downloader.manifest.close()
+        shutil.rmtree(job.output_dir, ignore_errors=True)
+        raise
+
+
+def resume_unfinished_jobs():
+    """Restart the jobs whose process stopped (see JobStore.unfinished)"""
+    for job in jobs.unfinished():
+        try:
+            job.rate_limiter = rate_limiter_from_request(job.rate_config or {}) or download_rate_limiter
+        except ValueError:
+            job.rate_limiter = download_rate_limiter
+        print(f"Resuming download job {job.job_id} ({job.total} files)")
+        # Files finished before the restart are skipped via the output directory's manifest
+        start_download(job, force=True)
+
+
+def rate_limiter_from_request(data: dict):
+    """
+    Build a RateLimiter from the optional 'rate_limit' (requests/sec per host)
+    and 'host_rates' ({host: requests/sec}) request fields
+    """
+    rate = data.get('rate_limit')
+    host_rates = data.get('host_rates') or {}
+    if not rate and not host_rates:
+        return None
+
+    try:
+        return RateLimiter(rate=float(rate) if rate else None,
+                           host_rates={host: float(r) for host, r in host_rates.items()})
+    except (TypeError, ValueError, AttributeError):
+        raise ValueError('Invalid rate_limit or host_rates')
 
 
 def parse_page_range(page_range: str):
@@ -216,6 +623,21 @@ def parse_page_range(page_range: str):
         return [1]
 
 
+def watch_unfinished_jobs():
+    """Resume interrupted jobs now, then whenever another process's job lease runs out"""
+    while True:
+        try:
+            resume_unfinished_jobs()
+        except Exception as e:
+            print(f"Error resuming download jobs: {e}")
+        time.sleep(jobs.lease)
+
+
+# Pick up interrupted jobs; under the debug reloader only in the serving child process
+if jobs.path and (__name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+    threading.Thread(target=watch_unfinished_jobs, daemon=True).start()
+
+
 if __name__ == '__main__':
     # Create downloads directory
     os.makedirs('downloads', exist_ok=True)
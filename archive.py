@@ -0,0 +1,79 @@
+"""
+Streaming ZIP archive writer
+
+Builds a ZIP file on the fly and yields it in small chunks, so an archive of
+any size can be sent to a client while only a small buffer is held in memory.
+"""
+
+import io
+import os
+import zipfile
+from typing import Iterable, Iterator, Tuple
+
+
+# Formats that are already compressed; deflating them again wastes CPU for no gain
+STORED_EXTENSIONS = {
+    'pdf', 'docx', 'xlsx', 'pptx',
+    'zip', 'rar', '7z', 'gz',
+    'jpg', 'jpeg', 'png', 'gif',
+    'mp3', 'mp4', 'avi', 'mov', 'wmv'
+}
+
+
+class _StreamBuffer(io.RawIOBase):
+    """Write-only, non-seekable buffer that is drained after every write"""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_zip(files: Iterable[Tuple[str, str]], chunk_size: int = 64 * 1024) -> Iterator[bytes]:
+    """
+    Generate a ZIP archive chunk by chunk
+
+    Args:
+        files: Iterable of (path on disk, name inside the archive) pairs
+        chunk_size: Number of bytes read from each file at a time
+
+    Yields:
+        Consecutive pieces of the ZIP file
+    """
+    buffer = _StreamBuffer()
+
+    with zipfile.ZipFile(buffer, 'w') as zf:
+        for path, arcname in files:
+            zinfo = zipfile.ZipInfo.from_file(path, arcname)
+            extension = os.path.splitext(arcname)[1].lstrip('.').lower()
+            if extension in STORED_EXTENSIONS:
+                zinfo.compress_type = zipfile.ZIP_STORED
+            else:
+                zinfo.compress_type = zipfile.ZIP_DEFLATED
+
+            with open(path, 'rb') as src, zf.open(zinfo, 'w') as dst:
+                while True:
+                    block = src.read(chunk_size)
+                    if not block:
+                        break
+                    dst.write(block)
+
+                    data = buffer.drain()
+                    if data:
+                        yield data
+
+            yield buffer.drain()
+
+    # Central directory
+    yield buffer.drain()
@@ -8,12 +8,20 @@ import os
 import re
 import time
 import requests
-from urllib.parse import urljoin, urlparse
+from urllib.parse import unquote, urljoin, urlparse
 from pathlib import Path
+from urlnorm import URLCanonicalizer
 
 # Base URL for normalizing relative paths
 BASE_URL = "https://www.awe.co.uk"
 
+# Hosts the document links were collected under, mapped to the real site
+AWE_CANONICALIZER = URLCanonicalizer(host_aliases={
+    "awe.co.uk": "www.awe.co.uk",
+    "awe.org.uk": "www.awe.co.uk",
+    "wp-content": "www.awe.co.uk/wp-content",
+})
+
 # Output directory
 OUTPUT_DIR = "awe-docs"
 
@@ -394,24 +402,7 @@ def normalize_url(url):
     """
     Normalize URLs to full absolute URLs with https://www.awe.co.uk
     """
-    # Remove leading/trailing whitespace
-    url = url.strip()
-
-    # Handle different URL patterns
-    if url.startswith("https://www.awe.co.uk/"):
-        return url
-    elif url.startswith("https://awe.co.uk/"):
-        return url.replace("https://awe.co.uk/", "https://www.awe.co.uk/")
-    elif url.startswith("https://awe.org.uk/"):
-        return url.replace("https://awe.org.uk/", "https://www.awe.co.uk/")
-    elif url.startswith("https://wp-content/"):
-        return url.replace("https://wp-content/", "https://www.awe.co.uk/wp-content/")
-    elif url.startswith("/wp-content/"):
-        return f"https://www.awe.co.uk{url}"
-    elif url.startswith("wp-content/"):
-        return f"https://www.awe.co.uk/{url}"
-    else:
-        return url
+    return AWE_CANONICALIZER(url, base=BASE_URL + "/")
 
 
 def get_filename_from_url(url):
@@ -419,7 +410,7 @@ def get_filename_from_url(url):
     Extract filename from URL
     """
     parsed = urlparse(url)
-    filename = os.path.basename(parsed.path)
+    filename = unquote(os.path.basename(parsed.path))
     return filename
 
 
@@ -3,12 +3,29 @@ File downloader module for downloading files from URLs
 """
 
 import os
+import json
+import hashlib
 import time
 import requests
+from requests.adapters import HTTPAdapter
 from pathlib import Path
 from urllib.parse import urlparse, unquote
-from typing import List, Dict, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Callable, Iterable, Optional
 import re
+import queue
+import threading
+from throttle import HostConnectionLimiter, RateLimiter
+from manifest import DownloadManifest
+from urlnorm import URLCanonicalizer
+
+
+# ioctl request for a copy-on-write clone of a whole file (Linux btrfs/xfs)
+FICLONE = 0x40049409
+
+
+class IncompleteDownloadError(IOError):
+    """Raised when a transfer ends before the announced size was received"""
 
 
 class FileDownloader:
@@ -18,7 +35,16 @@ class FileDownloader:
                  output_dir: str = "downloads",
                  timeout: int = 60,
                  chunk_size: int = 8192,
-                 rate_limit: float = 0.5):
+                 rate_limit: float = 0.5,
+                 max_workers: int = 1,
+                 max_per_host: int = 4,
+                 host_limiter: Optional[HostConnectionLimiter] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 max_retries: int = 3,
+                 segments: int = 1,
+                 segment_threshold: int = 50 * 1024 * 1024,
+                 deduplicate: bool = True,
+                 canonicalizer: Optional[URLCanonicalizer] = None):
         """
         Initialize downloader
 
@@ -26,15 +52,40 @@ class FileDownloader:
             output_dir: Directory to save downloaded files
             timeout: Request timeout in seconds
             chunk_size: Size of chunks for streaming downloads
-            rate_limit: Delay between downloads in seconds
+            rate_limit: Minimum delay between requests to the same host in seconds
+                        (ignored when rate_limiter is given)
+            max_workers: Number of files downloaded concurrently (1 = sequential)
+            max_per_host: Maximum simultaneous downloads from a single host
+                          (ignored when host_limiter is given)
+            host_limiter: Optional HostConnectionLimiter shared with other downloaders
+            rate_limiter: Optional shared per-host RateLimiter
+            max_retries: Number of times an interrupted download is resumed
+            segments: Parallel byte-range connections used for large files (1 = off)
+            segment_threshold: Minimum file size in bytes for a segmented download
+            deduplicate: Hardlink (or reflink) files whose content was already downloaded
+            canonicalizer: URLCanonicalizer applied before downloading, so
+                           variants of one URL are fetched and recorded once
         """
         self.output_dir = output_dir
         self.timeout = timeout
         self.chunk_size = chunk_size
         self.rate_limit = rate_limit
+        self.max_workers = max(1, max_workers)
+        self.host_limiter = host_limiter or HostConnectionLimiter(max_per_host)
+        if rate_limiter is None:
+            rate_limiter = RateLimiter(rate=1 / rate_limit if rate_limit and rate_limit > 0 else None)
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.segments = max(1, segments)
+        self.segment_threshold = segment_threshold
+        self.deduplicate = deduplicate
+        self.canonicalizer = canonicalizer or URLCanonicalizer()
 
         # Create output directory
         Path(output_dir).mkdir(parents=True, exist_ok=True)
+        self.manifest = DownloadManifest(output_dir, canonicalizer=self.canonicalizer)
+        self._inflight: Dict[str, list] = {}
+        self._inflight_guard = threading.Lock()
 
         # Setup session
         self.session = requests.Session()
@@ -42,6 +93,11 @@ class FileDownloader:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
 
+        # Keep enough pooled connections around for the worker threads
+        adapter = HTTPAdapter(pool_maxsize=max(10, self.max_workers))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
     def download_file(self,
                      url: str,
                      filename: Optional[str] = None,
@@ -57,120 +113,664 @@ class FileDownloader:
         Returns:
             True if successful, False otherwise
         """
+        link = {'url': url, 'filename': filename} if filename else {'url': url}
+        return self.download_link(link, progress_callback)['status'] != 'failed'
+
+    def _download(self,
+                  url: str,
+                  filename: Optional[str] = None,
+                  progress_callback: Optional[Callable] = None) -> Dict[str, any]:
+        """
+        Download a single file unless the manifest shows it is already complete
+
+        Args:
+            url: URL to download
+            filename: Optional preferred filename (will extract from URL if not provided)
+            progress_callback: Optional callback function(current, total)
+
+        Returns:
+            Dictionary with 'url', 'status' ('successful', 'skipped' or 'failed'),
+            'filename', 'size', 'sha256' and 'duplicate_of' keys
+        """
+        # Serialize downloads of the same URL so they never share a .part file
+        key = self.canonicalizer(url)
+        with self._inflight_guard:
+            inflight = self._inflight.setdefault(key, [threading.Lock(), 0])
+            inflight[1] += 1
+
         try:
-            # Get filename
-            if not filename:
-                filename = self._get_filename_from_url(url)
+            with inflight[0]:
+                result = self._download_once(key, filename, progress_callback)
+                if result['status'] == 'failed' and result['filename']:
+                    self.manifest.release_filename(key, result['filename'])
+                result['url'] = url
+                return result
+        finally:
+            with self._inflight_guard:
+                inflight[1] -= 1
+                if not inflight[1]:
+                    del self._inflight[key]
+
+    def _download_once(self,
+                       url: str,
+                       filename: Optional[str],
+                       progress_callback: Optional[Callable]) -> Dict[str, any]:
+        """Body of _download, run while holding the URL's in-flight lock"""
+        result = {'url': url, 'status': 'failed', 'filename': filename,
+                  'size': None, 'sha256': None, 'duplicate_of': None}
 
-            # Sanitize filename
-            filename = self._sanitize_filename(filename)
+        try:
+            # Get filename (a URL keeps the name recorded in earlier runs)
+            preferred = self._sanitize_filename(filename or self._get_filename_from_url(url))
+            filename = self.manifest.claim_filename(url, preferred)
+            result['filename'] = filename
 
             output_path = os.path.join(self.output_dir, filename)
 
-            # Skip if file already exists
-            if os.path.exists(output_path):
-                return True
+            # Skip if the manifest has an intact copy
+            if self.manifest.is_complete(url):
+                entry = self.manifest.get(url)
+                result.update(status='skipped', size=entry['size'], sha256=entry['sha256'])
+                return result
+
+            # Retry transient failures; each retry resumes from the .part file
+            for attempt in range(self.max_retries + 1):
+                try:
+                    info = self._fetch_to_path(url, output_path, progress_callback)
+                    if self.deduplicate:
+                        result['duplicate_of'] = self._link_duplicate(url, output_path, info['sha256'])
+                    self.manifest.record(url, filename, **info)
+                    result.update(status='successful', size=info['size'], sha256=info['sha256'])
+                    return result
+                except (requests.ConnectionError, requests.Timeout,
+                        requests.exceptions.ChunkedEncodingError, IncompleteDownloadError) as e:
+                    error = e
+                except requests.HTTPError as e:
+                    error = e
+                    if e.response is None or e.response.status_code < 500:
+                        break
+
+                if attempt < self.max_retries:
+                    time.sleep(min(2 ** attempt, 30))
+
+            print(f"Error downloading {url}: {error}")
+            return result
+
+        except Exception as e:
+            print(f"Error downloading {url}: {e}")
+            return result
+
+    def _fetch_to_path(self,
+                       url: str,
+                       output_path: str,
+                       progress_callback: Optional[Callable] = None) -> Dict[str, any]:
+        """
+        Stream a URL into output_path via a .part file
+
+        Data is written to "<output_path>.part" and renamed into place once
+        complete. The response validators are kept next to it in
+        "<output_path>.part.meta", so an interrupted transfer resumes with a
+        Range/If-Range request. If the server ignores the range or the file
+        changed in the meantime, the download restarts from zero. When segments
+        are enabled and the response announces a large enough file that can be
+        fetched by ranges, it is handed to _fetch_segmented instead.
+
+        Args:
+            url: URL to download
+            output_path: Final path of the file
+            progress_callback: Optional callback function(current, total)
+
+        Returns:
+            Dictionary with the 'size', 'etag', 'last_modified' and 'sha256' of the file
+
+        Raises:
+            requests.RequestException: On HTTP or network errors
+            IncompleteDownloadError: If fewer bytes than announced were received
+        """
+        part_path = output_path + '.part'
+        meta_path = part_path + '.meta'
+
+        headers = {}
+        offset = 0
+        meta = self._read_part_meta(meta_path)
+        if meta.get('url') == url and not meta.get('segments') and os.path.exists(part_path):
+            validator = self._range_validator(meta)
+            offset = os.path.getsize(part_path)
+            if validator and offset:
+                headers['Range'] = f'bytes={offset}-'
+                headers['If-Range'] = validator
+            else:
+                offset = 0
+
+        self.rate_limiter.acquire(url)
+        response = self.session.get(url, timeout=self.timeout, stream=True, headers=headers)
+
+        with response:
+            if response.status_code == 416 and offset:
+                # Our partial file is no longer valid for this resource
+                self._remove_part(part_path)
+                raise IncompleteDownloadError('Requested range not satisfiable, restarting')
 
-            # Download file
-            response = self.session.get(url, timeout=self.timeout, stream=True)
             response.raise_for_status()
 
+            if not (offset and self._is_resumed_response(response, offset)):
+                if response.status_code == 206:
+                    # Some other range than the one requested; written as the whole
+                    # file it would be truncated or shifted
+                    self._remove_part(part_path)
+                    raise IncompleteDownloadError('Unexpected Content-Range in partial response, restarting')
+                offset = 0
+
+            if not offset and self._segmentable(response.headers):
+                # The size is known now; the body is fetched by ranges over several connections instead
+                response.close()
+                return self._fetch_segmented(url, output_path, response.headers, progress_callback)
+
             # Get file size
             total_size = int(response.headers.get('content-length', 0))
+            if total_size:
+                total_size += offset
+
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            if offset:
+                etag = etag or meta.get('etag')
+                last_modified = last_modified or meta.get('last_modified')
+            self._write_part_meta(meta_path, {'url': url, 'etag': etag, 'last_modified': last_modified})
+
+            # Hash while streaming; only a resumed prefix has to be read back
+            sha256 = self._hash_file(part_path) if offset else hashlib.sha256()
 
             # Download with progress
-            downloaded = 0
-            with open(output_path, 'wb') as f:
+            downloaded = offset
+            with open(part_path, 'ab' if offset else 'wb') as f:
                 for chunk in response.iter_content(chunk_size=self.chunk_size):
                     if chunk:
                         f.write(chunk)
+                        sha256.update(chunk)
                         downloaded += len(chunk)
 
-                        if progress_callback and total_size:
+                        if progress_callback:
+                            # total_size is 0 when the server sends no Content-Length
                             progress_callback(downloaded, total_size)
 
-            return True
+        if total_size and downloaded < total_size:
+            raise IncompleteDownloadError(f'Received {downloaded} of {total_size} bytes')
 
-        except Exception as e:
-            print(f"Error downloading {url}: {e}")
-            # Clean up partial file
-            if 'output_path' in locals() and os.path.exists(output_path):
-                os.remove(output_path)
+        os.replace(part_path, output_path)
+        self._remove_part(meta_path)
+
+        return {'size': downloaded, 'etag': etag, 'last_modified': last_modified, 'sha256': sha256.hexdigest()}
+
+    def _segmentable(self, headers) -> bool:
+        """Check whether response headers qualify a file for a segmented download"""
+        if self.segments < 2 or headers.get('Accept-Ranges', '').lower() != 'bytes':
             return False
+        size = headers.get('content-length') or ''
+        return (size.isdigit() and int(size) >= self.segment_threshold
+                and bool(self._range_validator({'etag': headers.get('ETag'),
+                                                'last_modified': headers.get('Last-Modified')})))
+
+    def _fetch_segmented(self,
+                         url: str,
+                         output_path: str,
+                         headers,
+                         progress_callback: Optional[Callable] = None) -> Dict[str, any]:
+        """
+        Download a large file over several parallel byte-range connections
+
+        The .part file is preallocated to the full size and every segment writes
+        at its own offset. Segments retry independently, and their progress is
+        saved in the .part.meta sidecar so a later attempt only fetches what is
+        missing.
+
+        The caller holds one connection slot for the host; each further
+        segment connection needs a slot of its own, so only as many segments
+        run at once as the host has free slots (possibly just one).
+
+        Args:
+            url: URL to download
+            output_path: Final path of the file
+            headers: Headers of a full response for the URL (see _segmentable)
+            progress_callback: Optional callback function(current, total)
+
+        Returns:
+            Same dictionary as _fetch_to_path
+
+        Raises:
+            IncompleteDownloadError: If a segment still failed after its retries
+        """
+        total_size = int(headers['content-length'])
+        validator = self._range_validator({'etag': headers.get('ETag'),
+                                           'last_modified': headers.get('Last-Modified')})
+
+        part_path = output_path + '.part'
+        meta_path = part_path + '.meta'
+        meta = self._read_part_meta(meta_path)
+
+        if (meta.get('url') == url and meta.get('validator') == validator and meta.get('segments')
+                and os.path.exists(part_path) and os.path.getsize(part_path) == total_size):
+            segments = meta['segments']
+        else:
+            # Split into [start, end, bytes_done] ranges and preallocate the file
+            size = -(-total_size // self.segments)
+            segments = [[start, min(start + size, total_size) - 1, 0]
+                        for start in range(0, total_size, size)]
+            with open(part_path, 'wb') as f:
+                f.truncate(total_size)
+
+        lock = threading.Lock()
+        downloaded = [sum(segment[2] for segment in segments)]
+
+        def on_chunk(length: int):
+            with lock:
+                downloaded[0] += length
+                current = downloaded[0]
+            if progress_callback:
+                progress_callback(current, total_size)
+
+        remaining = [segment for segment in segments if segment[0] + segment[2] <= segment[1]]
+        try:
+            with self.host_limiter.spare_slots(url, len(remaining) - 1) as spare:
+                with ThreadPoolExecutor(max_workers=1 + spare) as executor:
+                    futures = [executor.submit(self._fetch_segment, url, part_path, segment, validator, on_chunk)
+                               for segment in remaining]
+                    errors = [future.exception() for future in futures if future.exception()]
+        finally:
+            self._write_part_meta(meta_path, {'url': url, 'validator': validator, 'segments': segments})
+
+        if errors:
+            raise IncompleteDownloadError(f'{len(errors)} segment(s) failed: {errors[0]}')
+
+        # Segments arrive out of order, so the checksum needs one pass over the file
+        sha256 = self._hash_file(part_path)
+
+        os.replace(part_path, output_path)
+        self._remove_part(meta_path)
+
+        return {
+            'size': total_size,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'sha256': sha256.hexdigest()
+        }
+
+    def _fetch_segment(self,
+                       url: str,
+                       part_path: str,
+                       segment: List[int],
+                       validator: str,
+                       on_chunk: Callable):
+        """
+        Fetch one byte range into the preallocated .part file, with its own retries
+
+        Args:
+            url: URL to download
+            part_path: Path of the preallocated partial file
+            segment: [start, end, bytes_done] list, updated in place
+            validator: ETag or Last-Modified value sent as If-Range
+            on_chunk: Callback function(length) for each chunk written
+        """
+        start, end = segment[0], segment[1]
+
+        for attempt in range(self.max_retries + 1):
+            offset = start + segment[2]
+            response = None
+            try:
+                self.rate_limiter.acquire(url)
+                headers = {'Range': f'bytes={offset}-{end}', 'If-Range': validator}
+                with self.session.get(url, timeout=self.timeout, stream=True, headers=headers) as response:
+                    response.raise_for_status()
+                    if not self._is_resumed_response(response, offset):
+                        # The file changed or ranges are no longer served; retrying won't help
+                        raise IncompleteDownloadError('Server did not honour the byte range')
+
+                    with open(part_path, 'r+b') as f:
+                        f.seek(offset)
+                        for chunk in response.iter_content(chunk_size=self.chunk_size):
+                            if chunk:
+                                chunk = chunk[:end + 1 - start - segment[2]]
+                                f.write(chunk)
+                                segment[2] += len(chunk)
+                                on_chunk(len(chunk))
+
+                if start + segment[2] > end:
+                    return
+                error = IncompleteDownloadError(f'Segment {start}-{end} ended early')
+            except (requests.RequestException, IncompleteDownloadError) as e:
+                error = e
+                if response is not None and response.status_code == 200:
+                    break
+
+            if attempt < self.max_retries:
+                time.sleep(min(2 ** attempt, 30))
+
+        raise error
+
+    def _link_duplicate(self, url: str, output_path: str, sha256: str) -> Optional[str]:
+        """
+        Replace a freshly downloaded file with a link to an identical earlier download
+
+        A hardlink is tried first, then a copy-on-write reflink (Linux FICLONE).
+        If neither is supported the separate copy is kept.
+
+        Args:
+            url: URL the file was downloaded from
+            output_path: Path of the new file
+            sha256: Hex SHA-256 digest of the new file
+
+        Returns:
+            Filename of the existing copy if the new file now shares its data, else None
+        """
+        original = self.manifest.find_by_sha256(sha256, exclude_url=url)
+        if not original:
+            return None
+
+        source = os.path.join(self.output_dir, original['filename'])
+        if os.path.abspath(source) == os.path.abspath(output_path):
+            return None
+
+        tmp_path = output_path + '.link'
+        try:
+            os.link(source, tmp_path)
+        except OSError:
+            try:
+                import fcntl
+                with open(source, 'rb') as src, open(tmp_path, 'wb') as dst:
+                    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+            except (ImportError, OSError):
+                self._remove_part(tmp_path)
+                return None
+
+        os.replace(tmp_path, output_path)
+        return original['filename']
+
+    def _hash_file(self, path: str):
+        """Return a SHA-256 hash object fed with the contents of a file"""
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                sha256.update(block)
+        return sha256
+
+    @staticmethod
+    def _range_validator(meta: Dict[str, str]) -> Optional[str]:
+        """Pick the validator to send in If-Range (weak ETags are not allowed)"""
+        etag = meta.get('etag')
+        if etag and not etag.startswith('W/'):
+            return etag
+        return meta.get('last_modified')
+
+    @staticmethod
+    def _is_resumed_response(response: requests.Response, offset: int) -> bool:
+        """Check that a response continues the partial file at the given offset"""
+        if response.status_code != 206:
+            return False
+        match = re.match(r'bytes (\d+)-', response.headers.get('Content-Range', ''))
+        return bool(match) and int(match.group(1)) == offset
+
+    @staticmethod
+    def _read_part_meta(meta_path: str) -> Dict[str, str]:
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @staticmethod
+    def _write_part_meta(meta_path: str, meta: Dict[str, str]):
+        with open(meta_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+    @staticmethod
+    def _remove_part(path: str):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
 
     def download_batch(self,
                       links: List[Dict[str, str]],
-                      show_progress: bool = True) -> Dict[str, any]:
+                      show_progress: bool = True,
+                      max_workers: Optional[int] = None,
+                      file_callback: Optional[Callable] = None) -> Dict[str, any]:
         """
         Download multiple files
 
+        With more than one worker, files are downloaded by a thread pool that
+        keeps up to max_workers transfers in flight, capped per host. Request
+        pacing is left to the rate limiter, so skipped files cost no delay.
+
         Args:
             links: List of link dictionaries with 'url' and 'text' keys
             show_progress: Whether to show progress output
+            max_workers: Number of concurrent downloads (defaults to self.max_workers)
+            file_callback: Optional callback function(link, status) called after
+                           each file, where status is 'successful', 'skipped' or 'failed'
 
         Returns:
-            Dictionary with download statistics
+            Dictionary with download statistics. 'files' lists the filename,
+            status, size and SHA-256 of every link.
         """
         total = len(links)
-        successful = 0
-        failed = 0
-        skipped = 0
-        failed_urls = []
+        workers = max(1, max_workers or self.max_workers)
+        results = self._new_batch_results(total)
 
         print(f"\n{'='*60}")
         print(f"Starting batch download: {total} files")
         print(f"Output directory: {os.path.abspath(self.output_dir)}")
+        if workers > 1:
+            print(f"Parallel downloads: {workers}")
         print(f"{'='*60}\n")
 
-        for i, link in enumerate(links, 1):
-            url = link['url']
-            filename = self._get_filename_from_url(url)
-            output_path = os.path.join(self.output_dir, self._sanitize_filename(filename))
+        def record(done: int, link: Dict[str, str], result: Dict[str, any]):
+            self._record_result(results, link, result, f"[{done}/{total}]", show_progress, file_callback)
+
+        if workers == 1:
+            for i, link in enumerate(links, 1):
+                record(i, link, self.download_link(link))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(self.download_link, link): link for link in links}
+                for done, future in enumerate(as_completed(futures), 1):
+                    record(done, futures[future], future.result())
+
+        self._print_summary(results)
+        return results
+
+    def download_stream(self,
+                        links: Iterable[Dict[str, str]],
+                        show_progress: bool = True,
+                        max_workers: Optional[int] = None,
+                        queue_size: int = 50,
+                        file_callback: Optional[Callable] = None,
+                        failed_log: Optional[str] = None) -> Dict[str, any]:
+        """
+        Download files while their links are still being produced
 
-            if show_progress:
-                print(f"[{i}/{total}] ", end="")
+        The links iterable (e.g. a scraper generator) is consumed in the calling
+        thread and handed to max_workers download threads through a bounded
+        queue. When the downloads fall behind and the queue is full, consuming
+        stops until a worker takes the next link, so a fast scraper cannot run
+        arbitrarily far ahead of the downloads.
 
-            # Check if already exists
-            if os.path.exists(output_path):
-                if show_progress:
-                    print(f"✓ Skipped (exists): {filename}")
-                skipped += 1
-                continue
+        Memory stays flat however many links there are: only counters are kept.
+        Completed files are recorded in the output directory's manifest, and
+        failed links can be written to a JSON Lines file that --from-links
+        accepts for a retry.
 
-            # Download
-            success = self.download_file(url)
+        Args:
+            links: Iterable of link dictionaries with 'url' and 'text' keys
+            show_progress: Whether to show progress output
+            max_workers: Number of concurrent downloads (defaults to self.max_workers)
+            queue_size: Maximum number of links waiting for a worker
+            file_callback: Optional callback function(link, status) called after
+                           each file, where status is 'successful', 'skipped' or 'failed'
+            failed_log: Optional path the failed links are written to (replaced
+                        at the end of the run, removed if nothing failed)
+
+        Returns:
+            Dictionary with the counters of download_batch (without 'files' and
+            'failed_urls'); 'total' is the number of links consumed
+        """
+        workers = max(1, max_workers or self.max_workers)
+        results = self._new_batch_results(0, keep_files=False)
+        failed_file = None
+        pending = queue.Queue(maxsize=max(1, queue_size))
+        lock = threading.Lock()
+        done = [0]
+
+        print(f"\n{'='*60}")
+        print("Starting pipelined download: files are fetched as links are found")
+        print(f"Output directory: {os.path.abspath(self.output_dir)}")
+        print(f"Parallel downloads: {workers}, queue size: {pending.maxsize}")
+        print(f"{'='*60}\n")
+
+        def work():
+            nonlocal failed_file
+            while True:
+                link = pending.get()
+                if link is None:
+                    return
+
+                # A failing download or callback fails this file only; the worker must
+                # keep draining the queue or the producer blocks on it forever
+                try:
+                    result = self.download_link(link)
+                except Exception as e:
+                    print(f"Error downloading {link.get('url')}: {e}")
+                    result = {'url': link.get('url'), 'status': 'failed', 'filename': None,
+                              'size': None, 'sha256': None, 'duplicate_of': None}
+
+                with lock:
+                    done[0] += 1
+                    try:
+                        self._record_result(results, link, result, f"[{done[0]}]", show_progress, file_callback)
+                        if result['status'] == 'failed' and failed_log:
+                            if failed_file is None:
+                                # Written beside the log, so a run reading the old log is unaffected
+                                failed_file = open(failed_log + '.part', 'w', encoding='utf-8')
+                            failed_file.write(json.dumps(link, ensure_ascii=False) + '\n')
+                    except Exception as e:
+                        print(f"Error reporting {link.get('url')}: {e}")
+
+        threads = [threading.Thread(target=work, daemon=True) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+
+        def hand_over(item) -> bool:
+            """Queue an item for the workers; False once none of them is left to take it"""
+            while any(thread.is_alive() for thread in threads):
+                try:
+                    pending.put(item, timeout=1)  # Waits while the queue is full
+                    return True
+                except queue.Full:
+                    continue
+            return False
 
-            if success:
-                if show_progress:
-                    print(f"✓ Downloaded: {filename}")
-                successful += 1
+        try:
+            for link in links:
+                if not hand_over(link):
+                    raise RuntimeError('All download workers stopped')
+                with lock:
+                    results['total'] += 1
+        finally:
+            # One stop marker per worker, queued behind the remaining links
+            for _ in threads:
+                if not hand_over(None):
+                    break
+            for thread in threads:
+                thread.join()
+
+            if failed_file is not None:
+                failed_file.close()
+                os.replace(failed_log + '.part', failed_log)
+            elif failed_log and os.path.exists(failed_log):
+                os.remove(failed_log)
+
+        self._print_summary(results)
+        if failed_file is not None:
+            print(f"Failed links saved to {failed_log} (retry with --from-links)\n")
+        return results
+
+    @staticmethod
+    def _new_batch_results(total: int, keep_files: bool = True) -> Dict[str, any]:
+        results = {'total': total, 'successful': 0, 'skipped': 0, 'failed': 0, 'deduplicated': 0}
+        if keep_files:
+            results.update(failed_urls=[], files=[])
+        return results
+
+    @staticmethod
+    def _record_result(results: Dict[str, any],
+                       link: Dict[str, str],
+                       result: Dict[str, any],
+                       label: str,
+                       show_progress: bool,
+                       file_callback: Optional[Callable]):
+        """Add one file's outcome to batch statistics and report it"""
+        status = result['status']
+        filename = result['filename']
+        results[status] += 1
+        if result['duplicate_of']:
+            results['deduplicated'] += 1
+        if 'files' in results:
+            if status == 'failed':
+                results['failed_urls'].append(link['url'])
+            results['files'].append({key: result[key] for key in
+                                     ('url', 'filename', 'status', 'size', 'sha256', 'duplicate_of')})
+
+        if show_progress:
+            if status == 'skipped':
+                print(f"{label} ✓ Skipped (exists): {filename}")
+            elif result['duplicate_of']:
+                print(f"{label} ✓ Downloaded: {filename} (same as {result['duplicate_of']}, linked)")
+            elif status == 'successful':
+                print(f"{label} ✓ Downloaded: {filename}")
             else:
-                if show_progress:
-                    print(f"✗ Failed: {filename}")
-                failed += 1
-                failed_urls.append(url)
+                print(f"{label} ✗ Failed: {filename}")
 
-            # Rate limiting
-            if i < total:
-                time.sleep(self.rate_limit)
+        if file_callback:
+            file_callback(link, status)
 
-        # Summary
+    def _print_summary(self, results: Dict[str, any]):
         print(f"\n{'='*60}")
         print(f"Download Complete!")
-        print(f"Successful: {successful}")
-        print(f"Skipped (already exist): {skipped}")
-        print(f"Failed: {failed}")
-        print(f"Total: {total}")
+        print(f"Successful: {results['successful']}")
+        print(f"Skipped (already exist): {results['skipped']}")
+        print(f"Failed: {results['failed']}")
+        if results['deduplicated']:
+            print(f"Deduplicated (linked to identical files): {results['deduplicated']}")
+        print(f"Total: {results['total']}")
         print(f"Files saved to: {os.path.abspath(self.output_dir)}")
         print(f"{'='*60}\n")
 
-        return {
-            'total': total,
-            'successful': successful,
-            'skipped': skipped,
-            'failed': failed,
-            'failed_urls': failed_urls
-        }
+    def download_link(self,
+                      link: Dict[str, str],
+                      progress_callback: Optional[Callable] = None) -> Dict[str, any]:
+        """
+        Download one link, as part of a batch or a shared queue
+
+        Args:
+            link: Link dictionary with a 'url' key and an optional 'filename'
+            progress_callback: Optional callback function(current, total)
+
+        Returns:
+            Result dictionary as returned by _download
+        """
+        url = link['url']
+
+        # Skipping is a manifest lookup and needs no connection slot
+        if self.manifest.is_complete(url):
+            entry = self.manifest.get(url)
+            return {'url': url, 'status': 'skipped', 'filename': entry['filename'],
+                    'size': entry['size'], 'sha256': entry['sha256'], 'duplicate_of': None}
+
+        with self.host_limiter.slot(url):
+            result = self._download(url, link.get('filename'), progress_callback)
+
+        if not result['filename']:
+            result['filename'] = self._get_filename_from_url(url)
+        return result
 
     def _get_filename_from_url(self, url: str) -> str:
         """
@@ -191,10 +791,10 @@ class FileDownloader:
 
         # If no filename, generate one
         if not filename or '.' not in filename:
-            # Use domain and timestamp
+            # Use domain and a hash of the URL so the name is stable across runs
             domain = parsed.netloc.replace('www.', '')
-            timestamp = int(time.time())
-            filename = f"{domain}_{timestamp}.file"
+            digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:10]
+            filename = f"{domain}_{digest}.file"
 
         return filename
 
@@ -235,3 +835,5 @@ class FileDownloader:
         """
         self.output_dir = output_dir
         Path(output_dir).mkdir(parents=True, exist_ok=True)
+        self.manifest.close()
+        self.manifest = DownloadManifest(output_dir, canonicalizer=self.canonicalizer)
@@ -0,0 +1,126 @@
+"""
+Per-job event streams
+
+A JobEventStream collects the events of one download job (file started,
+bytes received, file finished, job complete) and lets any number of readers
+follow it, e.g. the Server-Sent Events endpoint of the web app. Readers
+block until something new arrives instead of polling, and can resume from
+the last event ID they saw.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, Optional, Tuple
+
+
+class JobEventStream:
+    """Append-only, bounded sequence of job events"""
+
+    # Event that ends a stream
+    FINAL_EVENT = 'complete'
+
+    def __init__(self, max_events: int = 1000):
+        """
+        Initialize stream
+
+        Args:
+            max_events: Number of recent events kept for late or reconnecting readers
+        """
+        self._events = deque(maxlen=max_events)
+        self._next_id = 1
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def publish(self, event: str, data: Dict) -> int:
+        """
+        Append an event and wake up readers
+
+        Args:
+            event: Event type ('started', 'progress', 'done', 'failed', 'complete')
+            data: JSON-serializable event payload
+
+        Returns:
+            ID of the event
+        """
+        with self._condition:
+            event_id = self._next_id
+            self._next_id += 1
+            self._events.append((event_id, event, data))
+            if event == self.FINAL_EVENT:
+                self._closed = True
+            self._condition.notify_all()
+        return event_id
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def follow(self,
+               last_id: int = 0,
+               keepalive: float = 15) -> Iterator[Optional[Tuple[int, str, Dict]]]:
+        """
+        Iterate over events after last_id, waiting for new ones
+
+        Args:
+            last_id: ID of the last event the reader has already seen
+            keepalive: Seconds after which None is yielded if nothing happened,
+                       so the caller can keep its connection alive
+
+        Yields:
+            (event_id, event, data) tuples, or None on keepalive; ends after
+            the final event
+        """
+        while True:
+            with self._condition:
+                pending = [entry for entry in self._events if entry[0] > last_id]
+                if not pending and not self._closed:
+                    self._condition.wait(keepalive)
+                    pending = [entry for entry in self._events if entry[0] > last_id]
+                closed = self._closed
+
+            if not pending:
+                if closed:
+                    return
+                yield None
+                continue
+
+            for entry in pending:
+                yield entry
+                last_id = entry[0]
+                if entry[1] == self.FINAL_EVENT:
+                    return
+
+
+class ProgressThrottle:
+    """
+    Lets through at most one progress update per interval for each key
+
+    Called for every streamed chunk, so it takes no lock: each key is only
+    updated by the thread downloading that file.
+    """
+
+    def __init__(self, interval: float = 0.25):
+        self.interval = interval
+        self._last = {}
+
+    def ready(self, key: str, final: bool = False) -> bool:
+        """
+        Check whether an update for key should be published now
+
+        Args:
+            key: What the update is about (e.g. a file URL)
+            final: Always let the last update of a key through
+
+        Returns:
+            True if the update should be published
+        """
+        if final:
+            self._last.pop(key, None)
+            return True
+
+        now = time.monotonic()
+        if now - self._last.get(key, 0) < self.interval:
+            return False
+        self._last[key] = now
+        return True
@@ -0,0 +1,557 @@
+"""
+Download and scrape job bookkeeping for the web app
+
+JobStore keeps the jobs of the Flask app. Finished jobs are evicted from
+memory once they are older than a TTL or when more than a fixed number of
+them have piled up (least recently used first), so a long-running server
+stays flat in memory. With a SQLite path, jobs are also written to disk:
+finished jobs can still be looked up after eviction, and unfinished jobs are
+recovered when the server restarts. Each unfinished job is leased by the
+process running it, which renews the lease while it is alive; another process
+sharing the file only takes the job over once the lease has run out.
+
+TransferStats tracks the byte-level progress of a job. Each file's counters
+are written only by the worker thread streaming that file, so the download
+loop updates them without taking a lock; readers sum them up when the job
+status is requested.
+
+ScrapeJob collects the links of a scrape running in the background. Links
+are appended as pages finish, and readers can follow them from any offset
+while the scrape is still running.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Dict, Iterator, List, Optional
+from events import JobEventStream
+
+
+# Job states after which nothing changes any more
+FINISHED_STATUSES = {'completed', 'failed'}
+
+# Stored state of an unfinished job that a server process has taken over
+RESUMING_STATUS = 'resuming'
+
+
+class FileTransfer:
+    """Byte counters of one file of a job"""
+
+    __slots__ = ('url', 'status', 'bytes', 'total')
+
+    def __init__(self, url: str, total: Optional[int] = None):
+        self.url = url
+        self.status = 'downloading'  # downloading, successful, skipped, failed
+        self.bytes = 0
+        self.total = total
+
+    def update(self, current: int, total: int = 0):
+        """Record streamed bytes (called from the download loop, without locking)"""
+        self.bytes = current
+        if total:
+            self.total = total
+
+    def to_dict(self) -> Dict:
+        return {'url': self.url, 'status': self.status, 'bytes': self.bytes, 'total': self.total}
+
+
+class TransferStats:
+    """Bytes, throughput and ETA of a download job"""
+
+    def __init__(self, window: float = 10.0):
+        """
+        Initialize statistics
+
+        Args:
+            window: Seconds of history the rolling throughput is averaged over
+        """
+        self.window = window
+        self.files: Dict[str, FileTransfer] = {}
+        self.restored_bytes = 0  # Bytes reported before a restart
+        self.started_at = None
+        self._active: Dict[str, FileTransfer] = {}
+        # Running totals of finished files, so a snapshot only walks the active ones
+        self._finished_bytes = 0
+        self._skipped_bytes = 0
+        self._sized_files = 0
+        self._sized_bytes = 0
+        self._unsized_finished = 0
+        self._samples = deque()  # (time, bytes) pairs within the window
+        self._lock = threading.Lock()  # Guards the bookkeeping above, not the byte counters
+
+    def start_file(self, url: str, expected_size: Optional[int] = None) -> FileTransfer:
+        """
+        Register a file whose download starts
+
+        Args:
+            url: File URL
+            expected_size: Size known in advance (e.g. from probing), if any
+
+        Returns:
+            FileTransfer the download loop reports its bytes to
+        """
+        transfer = FileTransfer(url, expected_size or None)
+        with self._lock:
+            if self.started_at is None:
+                self.started_at = time.monotonic()
+            self.files[url] = self._active[url] = transfer
+        return transfer
+
+    def finish_file(self, url: str, status: str, size: Optional[int] = None):
+        """
+        Record the outcome of a file
+
+        Args:
+            url: File URL
+            status: 'successful', 'skipped' or 'failed'
+            size: Final size of the file, if known
+        """
+        with self._lock:
+            transfer = self._active.pop(url, None) or self.files.setdefault(url, FileTransfer(url))
+            transfer.status = status
+            if size is not None:
+                transfer.bytes = transfer.total = size
+
+            self._finished_bytes += transfer.bytes
+            if status == 'skipped':
+                # Already on disk; not transferred by this job
+                self._skipped_bytes += transfer.bytes
+            if transfer.total:
+                self._sized_files += 1
+                self._sized_bytes += transfer.total
+            else:
+                self._unsized_finished += 1
+
+    def snapshot(self, files_total: int = 0) -> Dict:
+        """
+        Summarize the transfer
+
+        Args:
+            files_total: Number of files in the job, used to estimate the
+                         size of files that have not started yet
+
+        Returns:
+            Dictionary with 'bytes_downloaded', 'total_bytes', 'throughput'
+            (bytes/second over the window), 'eta' (seconds) and 'active_files'
+        """
+        now = time.monotonic()
+        with self._lock:
+            active = list(self._active.values())
+            downloaded = self._finished_bytes + sum(t.bytes for t in active)
+            sized = [t.total for t in active if t.total]
+            sized_files = self._sized_files + len(sized)
+            sized_bytes = self._sized_bytes + sum(sized)
+            unsized_finished = self._unsized_finished
+
+            moved = downloaded - self._skipped_bytes
+            self._samples.append((now, moved))
+            while len(self._samples) > 2 and self._samples[0][0] < now - self.window:
+                self._samples.popleft()
+            first_time, first_bytes = self._samples[0]
+
+            if now - first_time >= 1:
+                throughput = (moved - first_bytes) / (now - first_time)
+            elif self.started_at is not None and now > self.started_at:
+                throughput = moved / (now - self.started_at)
+            else:
+                throughput = 0.0
+
+        # Files of unknown size are assumed to be as large as the average known one
+        total = sized_bytes
+        unknown = max(0, files_total - sized_files - unsized_finished)
+        if unknown and sized_files:
+            total += unknown * sized_bytes // sized_files
+
+        eta = None
+        if throughput > 0 and sized_files and total >= downloaded:
+            eta = round((total - downloaded) / throughput, 1)
+
+        return {
+            'bytes_downloaded': self.restored_bytes + downloaded,
+            'total_bytes': (self.restored_bytes + total) or None,
+            'throughput': round(throughput, 1),
+            'eta': eta,
+            'active_files': [t.to_dict() for t in active],
+        }
+
+    def file_statuses(self) -> List[Dict]:
+        """Per-file status of every file that has started"""
+        with self._lock:
+            return [t.to_dict() for t in self.files.values()]
+
+
+class DownloadJob:
+    """Represents a download job"""
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.status = "pending"  # pending, scraping, downloading, completed, failed
+        self.links = []
+        self.progress = 0
+        self.total = 0
+        self.current_file = ""
+        self.output_dir = f"downloads/{job_id}"
+        self.error = None
+        self.rate_limiter = None
+        self.rate_config = None  # Request fields the rate limiter was built from
+        self.events = JobEventStream()  # Runtime only; not persisted
+        self.transfer = TransferStats()  # Runtime only; byte totals are persisted
+        self.created_at = time.time()
+        self.finished_at = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def to_dict(self, include_links: bool = True) -> Dict:
+        """
+        Serialize the job (without its runtime-only rate limiter, events and
+        per-file transfer counters)
+
+        Args:
+            include_links: Include the (possibly large) list of links
+
+        Returns:
+            JSON-serializable dictionary
+        """
+        data = {
+            'job_id': self.job_id,
+            'status': self.status,
+            'progress': self.progress,
+            'total': self.total,
+            'current_file': self.current_file,
+            'output_dir': self.output_dir,
+            'error': self.error,
+            'rate_config': self.rate_config,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at,
+            'bytes_downloaded': self.transfer.snapshot()['bytes_downloaded'],
+        }
+        if include_links:
+            data['links'] = self.links
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'DownloadJob':
+        """
+        Rebuild a job serialized with to_dict
+
+        Args:
+            data: Dictionary returned by to_dict
+
+        Returns:
+            DownloadJob instance
+        """
+        job = cls(data['job_id'])
+        for key in ('status', 'progress', 'total', 'current_file', 'output_dir',
+                    'error', 'rate_config', 'created_at', 'finished_at', 'links'):
+            if key in data:
+                setattr(job, key, data[key])
+        job.transfer.restored_bytes = data.get('bytes_downloaded', 0)
+        return job
+
+
+class ScrapeJob:
+    """Links of a scrape running in the background"""
+
+    def __init__(self, job_id: str, url: str):
+        self.job_id = job_id
+        self.url = url
+        self.status = "pending"  # pending, scraping, completed, failed
+        self.links = []
+        self.pages = 0
+        self.error = None
+        self.cached = False  # Served from the scrape result cache
+        self.created_at = time.time()
+        self.finished_at = None
+        self._condition = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    def add_links(self, links: List[Dict[str, str]]):
+        """
+        Append the new links of a scraped page and wake up readers
+
+        Args:
+            links: Links found on the page (already filtered and de-duplicated)
+        """
+        with self._condition:
+            self.links.extend(links)
+            self.pages += 1
+            self._condition.notify_all()
+
+    def finish(self, status: str, error: Optional[str] = None):
+        """
+        Mark the scrape as done
+
+        Args:
+            status: 'completed' or 'failed'
+            error: Error message of a failed scrape
+        """
+        with self._condition:
+            self.status = status
+            self.error = error
+            self.finished_at = time.time()
+            self._condition.notify_all()
+
+    def follow(self, offset: int = 0, keepalive: float = 15) -> Iterator[Optional[List[Dict[str, str]]]]:
+        """
+        Iterate over the links after offset, waiting for new pages
+
+        Args:
+            offset: Number of links the reader has already seen
+            keepalive: Seconds after which None is yielded if nothing happened
+
+        Yields:
+            Lists of new links, or None on keepalive; ends when the scrape has
+            finished and every link was yielded
+        """
+        while True:
+            with self._condition:
+                if len(self.links) <= offset and not self.finished:
+                    self._condition.wait(keepalive)
+                batch = self.links[offset:]
+                finished = self.finished
+
+            if batch:
+                offset += len(batch)
+                yield batch
+            elif finished:
+                return
+            else:
+                yield None
+
+
+class JobStore:
+    """Bounded store of download jobs with optional SQLite persistence"""
+
+    def __init__(self,
+                 path: Optional[str] = None,
+                 max_finished: int = 200,
+                 finished_ttl: float = 24 * 3600,
+                 lease: float = 60):
+        """
+        Initialize store
+
+        Args:
+            path: Optional SQLite file the jobs are persisted to
+            max_finished: Maximum number of finished jobs kept in memory
+            finished_ttl: Seconds a finished job is kept (in memory and on disk)
+            lease: Seconds an unfinished job stays owned by this process without
+                   a renewal; leases are renewed every third of this
+        """
+        self.path = path
+        self.max_finished = max_finished
+        self.finished_ttl = finished_ttl
+        self.lease = lease
+        self.owner = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._closed = threading.Event()
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    links TEXT NOT NULL,
+                    finished_at REAL,
+                    owner TEXT,
+                    lease_until REAL
+                )
+            """)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            for column, kind in (('owner', 'TEXT'), ('lease_until', 'REAL')):
+                if column not in columns:
+                    # Stores written before leases existed
+                    self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at)")
+            self._conn.commit()
+
+            threading.Thread(target=self._renew_leases, daemon=True).start()
+
+    def add(self, job: DownloadJob):
+        """
+        Register a new job
+
+        Args:
+            job: Job to store
+        """
+        with self._lock:
+            self._jobs[job.job_id] = job
+            if self._conn is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO jobs (job_id, status, state, links, finished_at, owner, lease_until) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (job.job_id, job.status, json.dumps(job.to_dict(include_links=False)),
+                     json.dumps(job.links), job.finished_at, self.owner, time.time() + self.lease)
+                )
+                self._conn.commit()
+            self._evict()
+
+    def remove(self, job_id: str):
+        """
+        Forget a job, e.g. one that was rejected before it started
+
+        Args:
+            job_id: Job ID
+        """
+        with self._lock:
+            self._jobs.pop(job_id, None)
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+                self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[DownloadJob]:
+        """
+        Look up a job
+
+        Jobs evicted from memory are read back from disk without being cached again.
+
+        Args:
+            job_id: Job ID
+
+        Returns:
+            DownloadJob, or None if unknown or expired
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._jobs.move_to_end(job_id)
+                return job
+
+            if self._conn is None:
+                return None
+            row = self._conn.execute("SELECT state, finished_at FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+
+        if row is None or (row[1] is not None and row[1] + self.finished_ttl < time.time()):
+            return None
+        return DownloadJob.from_dict(json.loads(row[0]))
+
+    def save(self, job: DownloadJob):
+        """
+        Persist a job's current state (links are written once, by add)
+
+        Finished jobs get their finish time stamped, drop their link list from
+        memory and become eligible for eviction.
+
+        Args:
+            job: Job whose state changed
+        """
+        if job.finished and job.finished_at is None:
+            job.finished_at = time.time()
+
+        with self._lock:
+            if self._conn is not None:
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, state = ?, finished_at = ? WHERE job_id = ?",
+                    (job.status, json.dumps(job.to_dict(include_links=False)), job.finished_at, job.job_id)
+                )
+                self._conn.commit()
+
+            if job.finished:
+                # Nothing reads the links of a finished job; don't keep them around
+                job.links = []
+                self._evict()
+
+    def unfinished(self) -> List[DownloadJob]:
+        """
+        Claim the unfinished jobs that no live process is running
+
+        Several server processes may share the store, and each renews the
+        lease of the jobs it runs. A job is only claimed once its lease has
+        run out (its process died or was stopped), including jobs a dead
+        process had claimed but not restarted yet. The claim is a conditional
+        update, so only one process gets each job. Claimed jobs are marked as
+        resuming until their work restarts and are put back into memory; the
+        caller restarts their work.
+
+        Returns:
+            List of unfinished jobs claimed by this process, oldest first
+        """
+        if self._conn is None:
+            return []
+
+        placeholders = ', '.join('?' * len(FINISHED_STATUSES))
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT job_id, state, links FROM jobs WHERE status NOT IN ({placeholders}) "
+                "AND (lease_until IS NULL OR lease_until < ?)",
+                (*FINISHED_STATUSES, now)
+            ).fetchall()
+
+            jobs = []
+            for job_id, state, links in rows:
+                claimed = self._conn.execute(
+                    "UPDATE jobs SET status = ?, owner = ?, lease_until = ? "
+                    "WHERE job_id = ? AND (lease_until IS NULL OR lease_until < ?)",
+                    (RESUMING_STATUS, self.owner, now + self.lease, job_id, now)
+                ).rowcount
+                self._conn.commit()
+                if not claimed:
+                    continue  # Another process took it
+
+                data = json.loads(state)
+                data['links'] = json.loads(links)
+                job = DownloadJob.from_dict(data)
+                self._jobs[job.job_id] = job
+                jobs.append(job)
+
+        return sorted(jobs, key=lambda job: job.created_at)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._jobs)
+
+    def _renew_leases(self):
+        """Keep the jobs of this process leased while it is alive"""
+        while not self._closed.wait(self.lease / 3):
+            with self._lock:
+                if self._conn is None:
+                    return
+                try:
+                    self._conn.execute(
+                        "UPDATE jobs SET lease_until = ? WHERE owner = ? AND finished_at IS NULL",
+                        (time.time() + self.lease, self.owner)
+                    )
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    print(f"Error renewing job leases: {e}")
+
+    def _evict(self):
+        """Drop expired finished jobs, then the least recently used finished ones"""
+        now = time.time()
+        finished = [job for job in self._jobs.values() if job.finished]
+
+        for job in finished:
+            if job.finished_at is not None and job.finished_at + self.finished_ttl < now:
+                del self._jobs[job.job_id]
+
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+            del self._jobs[job_id]
+
+        if self._conn is not None:
+            self._conn.execute("DELETE FROM jobs WHERE finished_at < ?", (now - self.finished_ttl,))
+            self._conn.commit()
+
+    def close(self):
+        """Close the underlying database, if any"""
+        self._closed.set()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -0,0 +1,159 @@
+"""
+Link manifests
+
+A link manifest is a JSON Lines file with one link dictionary per line, as
+produced by the scraper ({"url": ..., "text": ..., "extension": ...}). It
+lets scraping and downloading run separately: one run saves the links, and
+later runs (possibly on other machines, each taking a shard) download them.
+Manifests are read and written one line at a time, so their size is not
+limited by memory. Paths ending in .gz are gzip-compressed.
+"""
+
+import gzip
+import json
+import hashlib
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, Optional, Set, Tuple
+
+
+@contextmanager
+def _open(path: str, mode: str):
+    """Open a manifest for text reading ('r') or writing ('w')"""
+    if path.endswith('.gz'):
+        with gzip.open(path, mode + 't', encoding='utf-8') as f:
+            yield f
+    else:
+        with open(path, mode, encoding='utf-8') as f:
+            yield f
+
+
+def parse_shard(shard: str) -> Tuple[int, int]:
+    """
+    Parse a shard specification
+
+    Args:
+        shard: String like "2/4" (the second of four shards)
+
+    Returns:
+        Tuple of (index, count), index starting at 1
+
+    Raises:
+        ValueError: If the specification is malformed
+    """
+    try:
+        index, count = (int(part) for part in shard.split('/'))
+    except (ValueError, AttributeError):
+        raise ValueError(f"Invalid shard '{shard}' (expected K/N, e.g. 1/4)")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{shard}' (K must be between 1 and N)")
+    return index, count
+
+
+def in_shard(url: str, shard: Tuple[int, int]) -> bool:
+    """
+    Check whether a URL belongs to a shard
+
+    The URL is hashed, so every machine given the same manifest and shard
+    count picks a disjoint, roughly equal part of it.
+
+    Args:
+        url: Link URL
+        shard: Tuple of (index, count) from parse_shard
+
+    Returns:
+        True if the URL is part of the shard
+    """
+    index, count = shard
+    digest = hashlib.md5(url.encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') % count == index - 1
+
+
+def iter_save_links(links: Iterable[Dict[str, str]], path: str) -> Iterator[Dict[str, str]]:
+    """
+    Write links to a manifest while passing them on
+
+    Each link is written before it is yielded. Uncompressed manifests are
+    flushed line by line, so they are complete up to the last link consumed
+    even if the run is interrupted.
+
+    Args:
+        links: Iterable of link dictionaries
+        path: Manifest path
+
+    Yields:
+        The links, unchanged
+    """
+    # Flushing a gzip stream per line would ruin its compression
+    flush = not path.endswith('.gz')
+    with _open(path, 'w') as f:
+        for link in links:
+            f.write(json.dumps(link, ensure_ascii=False) + '\n')
+            if flush:
+                f.flush()
+            yield link
+
+
+def save_links(links: Iterable[Dict[str, str]], path: str) -> int:
+    """
+    Write links to a manifest
+
+    Args:
+        links: Iterable of link dictionaries
+        path: Manifest path
+
+    Returns:
+        Number of links written
+    """
+    count = 0
+    for _ in iter_save_links(links, path):
+        count += 1
+    return count
+
+
+def read_links(path: str,
+               filter_extensions: Optional[Set[str]] = None,
+               shard: Optional[Tuple[int, int]] = None) -> Iterator[Dict[str, str]]:
+    """
+    Read links from a manifest one line at a time
+
+    Blank lines are ignored; lines that are not a JSON object with a 'url' are
+    reported and skipped. Plain URL lists (one URL per line) are accepted too.
+
+    Args:
+        path: Manifest path
+        filter_extensions: Set of file extensions to keep
+        shard: Optional (index, count) from parse_shard to read only part of the links
+
+    Yields:
+        Link dictionaries with at least 'url', 'text' and 'extension' keys
+    """
+    with _open(path, 'r') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+
+            if line.startswith('{'):
+                try:
+                    link = json.loads(line)
+                except ValueError as e:
+                    print(f"Skipping line {line_number} of {path}: {e}")
+                    continue
+                if not isinstance(link, dict) or not isinstance(link.get('url'), str) or not link['url']:
+                    print(f"Skipping line {line_number} of {path}: no 'url' string")
+                    continue
+            else:
+                link = {'url': line}
+
+            url = link['url']
+            if shard and not in_shard(url, shard):
+                continue
+
+            link.setdefault('text', url.rsplit('/', 1)[-1] or url)
+            if 'extension' not in link:
+                path_part = url.split('?', 1)[0].split('#', 1)[0].rsplit('/', 1)[-1]
+                link['extension'] = path_part.rsplit('.', 1)[-1].lower() if '.' in path_part else ''
+            if filter_extensions and link['extension'] not in filter_extensions:
+                continue
+
+            yield link
@@ -4,10 +4,16 @@ Universal Web Scraper & Downloader
 A tool to scrape downloadable links from any webpage and download them all
 """
 
+import os
 import sys
 import argparse
 from scraper import LinkScraper
 from downloader import FileDownloader
+from throttle import RateLimiter, parse_host_rates
+from page_cache import PageCache
+from seen import SEEN_BACKENDS
+from probe import ProbeCache
+from linkfile import parse_shard, read_links, save_links
 
 
 def print_banner():
@@ -32,15 +38,16 @@ def interactive_mode():
         return
 
     # Initialize scraper
-    scraper = LinkScraper(base_url=url)
+    scraper = LinkScraper(base_url=url, max_workers=4)
 
     # Ask about pagination
     print("\n--- Pagination Options ---")
     print("1. Single page only")
     print("2. Auto-detect pagination")
     print("3. Manual pagination (e.g., page 1-10)")
+    print("4. Crawl the site (follow links to other pages)")
 
-    pagination_choice = input("\nSelect option (1/2/3): ").strip()
+    pagination_choice = input("\nSelect option (1/2/3/4): ").strip()
 
     links = []
 
@@ -51,12 +58,7 @@ def interactive_mode():
     elif pagination_choice == "2":
         # Auto-detect pagination
         print("\nAuto-detecting pagination...")
-        page_urls = scraper.auto_detect_pagination(url)
-        print(f"Found {len(page_urls)} pages")
-
-        for page_url in page_urls:
-            print(f"Scraping: {page_url}")
-            links.extend(scraper.scrape_page(page_url))
+        links = scraper.crawl_pagination(url)
 
     elif pagination_choice == "3":
         # Manual pagination
@@ -71,20 +73,24 @@ def interactive_mode():
 
         links = scraper.scrape_multiple_pages(pattern, page_numbers)
 
+    elif pagination_choice == "4":
+        # Recursive crawl
+        depth = input("\nHow many links deep? (press Enter for 2): ").strip()
+        max_pages = input("Maximum pages to crawl (press Enter for 200): ").strip()
+        try:
+            depth = int(depth) if depth else 2
+            max_pages = int(max_pages) if max_pages else 200
+        except ValueError:
+            print("Invalid number")
+            return
+
+        print("\nCrawling site...")
+        links = list(scraper.crawl_site(url, max_depth=depth, max_pages=max_pages))
+
     else:
         print("Invalid option")
         return
 
-    # Remove duplicates
-    seen_urls = set()
-    unique_links = []
-    for link in links:
-        if link['url'] not in seen_urls:
-            seen_urls.add(link['url'])
-            unique_links.append(link)
-
-    links = unique_links
-
     if not links:
         print("\n❌ No downloadable files found!")
         return
@@ -135,7 +141,7 @@ def interactive_mode():
         output_dir = "downloads"
 
     # Download
-    downloader = FileDownloader(output_dir=output_dir)
+    downloader = FileDownloader(output_dir=output_dir, max_workers=4)
     results = downloader.download_batch(links)
 
     # Show failed downloads
@@ -149,7 +155,61 @@ def command_line_mode(args):
     """Run in command-line mode with arguments"""
     print_banner()
 
-    scraper = LinkScraper(base_url=args.url)
+    # One limiter is shared by scraping and downloading so limits hold across both
+    rate_limiter = None
+    if args.rate or args.host_rate:
+        try:
+            host_rates = parse_host_rates(args.host_rate)
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        rate_limiter = RateLimiter(rate=args.rate, burst=args.burst, host_rates=host_rates)
+
+    page_cache = PageCache(args.page_cache) if args.page_cache else None
+
+    downloader_options = dict(output_dir=args.output,
+                              max_workers=args.download_workers,
+                              rate_limiter=rate_limiter,
+                              segments=args.segments,
+                              segment_threshold=int(args.segment_threshold * 1024 * 1024))
+
+    if args.from_links:
+        # Download only; the manifest is streamed, never loaded as a whole
+        try:
+            shard = parse_shard(args.shard) if args.shard else None
+        except ValueError as e:
+            print(f"Error: {e}")
+            sys.exit(1)
+        links = read_links(args.from_links, filter_extensions=args.extensions, shard=shard)
+        pipeline_mode(args, links, FileDownloader(**downloader_options),
+                      f"Download the links listed in {args.from_links}?")
+        return
+
+    seen_backend = 'sqlite' if args.seen_db else args.dedup
+    seen_options = {'path': args.seen_db} if args.seen_db else {}
+
+    scraper = LinkScraper(base_url=args.url,
+                          max_workers=args.workers,
+                          rate_limiter=rate_limiter,
+                          page_cache=page_cache,
+                          seen_backend=seen_backend,
+                          seen_options=seen_options,
+                          probe=args.probe,
+                          probe_cache=ProbeCache(path=args.probe_cache) if args.probe else None)
+
+    if args.save_links:
+        # Scrape only; the links are downloaded later with --from-links
+        count = save_links(iter_scraped_links(args, scraper), args.save_links)
+        if not count:
+            print("❌ No downloadable files found!")
+            sys.exit(1)
+        print(f"\nSaved {count} links to {args.save_links}")
+        return
+
+    if args.pipeline:
+        pipeline_mode(args, iter_scraped_links(args, scraper), FileDownloader(**downloader_options),
+                      "Download files as they are found?")
+        return
 
     # Scrape links
     if args.pages:
@@ -160,6 +220,12 @@ def command_line_mode(args):
 
         pattern = args.url if '{page}' in args.url else f"{args.url}/page/{{page}}"
         links = scraper.scrape_multiple_pages(pattern, page_numbers, filter_extensions=args.extensions)
+    elif args.crawl:
+        links = list(scraper.crawl_site(args.url,
+                                        filter_extensions=args.extensions,
+                                        max_depth=args.crawl_depth,
+                                        max_pages=args.max_pages,
+                                        scope=args.crawl_scope))
     else:
         links = scraper.scrape_page(args.url, filter_extensions=args.extensions)
 
@@ -181,10 +247,49 @@ def command_line_mode(args):
             sys.exit(0)
 
     # Download
-    downloader = FileDownloader(output_dir=args.output)
+    downloader = FileDownloader(**downloader_options)
     downloader.download_batch(links)
 
 
+def iter_scraped_links(args, scraper: LinkScraper):
+    """Links of the requested scrape, yielded as they are found"""
+    if args.pages:
+        page_numbers = parse_page_range(args.pages)
+        if not page_numbers:
+            print("Error: Invalid page range")
+            sys.exit(1)
+
+        pattern = args.url if '{page}' in args.url else f"{args.url}/page/{{page}}"
+        return scraper.iter_multiple_pages(pattern, page_numbers, filter_extensions=args.extensions)
+    elif args.crawl:
+        return scraper.crawl_site(args.url,
+                                  filter_extensions=args.extensions,
+                                  max_depth=args.crawl_depth,
+                                  max_pages=args.max_pages,
+                                  scope=args.crawl_scope)
+    elif args.probe:
+        # Probing classifies the links of the whole page at once
+        return iter(scraper.scrape_page(args.url, filter_extensions=args.extensions))
+    else:
+        return scraper.iter_links(args.url, filter_extensions=args.extensions)
+
+
+def pipeline_mode(args, links, downloader: FileDownloader, prompt: str):
+    """Download links while they are still being produced, through a bounded queue"""
+    # The number of files is only known at the end, so confirm up front
+    if not args.yes:
+        confirm = input(f"\n{prompt} (y/n): ").strip().lower()
+        if confirm != 'y':
+            print("Download cancelled")
+            sys.exit(0)
+
+    results = downloader.download_stream(links, queue_size=args.queue_size,
+                                         failed_log=os.path.join(args.output, 'failed-links.jsonl'))
+    if not results['total']:
+        print("❌ No downloadable files found!")
+        sys.exit(1)
+
+
 def parse_page_range(page_range: str):
     """
     Parse page range string into list of page numbers
@@ -232,6 +337,23 @@ Examples:
   # Download only PDFs from multiple pages
   python main.py --url "https://example.com/docs/page/{page}" --pages 1-10 --extensions pdf
 
+  # Scrape 200 pages, 8 at a time
+  python main.py --url "https://example.com/docs/page/{page}" --pages 1-200 --workers 8
+
+  # Download while scraping 200 pages instead of after
+  python main.py --url "https://example.com/docs/page/{page}" --pages 1-200 --pipeline -y
+
+  # Scrape once, then download the saved links on two machines
+  python main.py --url "https://example.com/docs/page/{page}" --pages 1-200 --save-links links.jsonl
+  python main.py --from-links links.jsonl --shard 1/2 -y
+  python main.py --from-links links.jsonl --shard 2/2 -y
+
+  # Crawl every page up to 3 links away from the docs section
+  python main.py --url https://example.com/docs/ --crawl --crawl-depth 3 --crawl-scope path
+
+  # Allow 10 requests/sec to example.com but only 2/sec to cdn.example.org
+  python main.py --url https://example.com/docs --host-rate example.com=10 --host-rate cdn.example.org=2
+
   # Download PDFs and DOCs to custom directory
   python main.py --url https://example.com/docs --extensions pdf,doc --output my-docs
         """
@@ -247,12 +369,152 @@ Examples:
         help='Page range to scrape (e.g., "1-10" or "1,2,3,5")'
     )
 
+    parser.add_argument(
+        '--crawl',
+        action='store_true',
+        help='Crawl the site from --url, following links to other pages'
+    )
+
+    parser.add_argument(
+        '--crawl-depth',
+        type=int,
+        default=2,
+        help='Maximum number of links followed from --url when crawling (default: 2)'
+    )
+
+    parser.add_argument(
+        '--max-pages',
+        type=int,
+        default=200,
+        help='Maximum number of pages fetched when crawling (default: 200)'
+    )
+
+    parser.add_argument(
+        '--crawl-scope',
+        choices=['domain', 'path'],
+        default='domain',
+        help='Stay on the same domain, or also below the URL\'s path (default: domain)'
+    )
+
+    parser.add_argument(
+        '--workers', '-w',
+        type=int,
+        default=4,
+        help='Number of pages to scrape concurrently with --pages or --crawl (default: 4)'
+    )
+
+    parser.add_argument(
+        '--download-workers',
+        type=int,
+        default=4,
+        help='Number of files to download in parallel (default: 4)'
+    )
+
+    parser.add_argument(
+        '--segments',
+        type=int,
+        default=1,
+        help='Parallel connections per large file when the server supports ranges (default: 1 = off)'
+    )
+
+    parser.add_argument(
+        '--segment-threshold',
+        type=float,
+        default=50,
+        metavar='MB',
+        help='Minimum file size in MB for segmented downloads (default: 50)'
+    )
+
+    parser.add_argument(
+        '--rate',
+        type=float,
+        help='Maximum requests per second to each host (default: unlimited scraping, 2/s downloads)'
+    )
+
+    parser.add_argument(
+        '--host-rate',
+        action='append',
+        default=[],
+        metavar='HOST=RATE',
+        help='Per-host requests per second, e.g. example.com=10 (repeatable)'
+    )
+
+    parser.add_argument(
+        '--burst',
+        type=float,
+        default=1,
+        help='Requests a host may receive back-to-back before --rate applies (default: 1)'
+    )
+
+    parser.add_argument(
+        '--page-cache',
+        metavar='PATH',
+        help='SQLite file for caching scraped pages between runs (conditional GET)'
+    )
+
+    parser.add_argument(
+        '--probe',
+        action='store_true',
+        help='Send HEAD requests to links without a file extension to find files behind them'
+    )
+
+    parser.add_argument(
+        '--probe-cache',
+        metavar='PATH',
+        help='SQLite file caching --probe results between runs (entries expire after a day)'
+    )
+
+    parser.add_argument(
+        '--dedup',
+        choices=sorted(SEEN_BACKENDS),
+        default='memory',
+        help='How links are de-duplicated: exact in memory, hashed digests, a Bloom filter, '
+             'or SQLite on disk (default: memory)'
+    )
+
+    parser.add_argument(
+        '--seen-db',
+        metavar='PATH',
+        help='SQLite file remembering links across runs; only links not seen before are returned'
+    )
+
     parser.add_argument(
         '--extensions', '-e',
         help='Comma-separated list of file extensions to download (e.g., pdf,doc,zip)',
         type=lambda x: set(ext.strip().lower() for ext in x.split(',')) if x else None
     )
 
+    parser.add_argument(
+        '--pipeline',
+        action='store_true',
+        help='Start downloading while pages are still being scraped'
+    )
+
+    parser.add_argument(
+        '--queue-size',
+        type=int,
+        default=50,
+        help='With --pipeline, links waiting for a download worker before scraping pauses (default: 50)'
+    )
+
+    parser.add_argument(
+        '--save-links',
+        metavar='PATH',
+        help='Write the scraped links to a JSONL manifest instead of downloading them'
+    )
+
+    parser.add_argument(
+        '--from-links',
+        metavar='PATH',
+        help='Download the links of a JSONL manifest (or plain URL list) without scraping'
+    )
+
+    parser.add_argument(
+        '--shard',
+        metavar='K/N',
+        help='With --from-links, download only the K-th of N disjoint parts of the manifest'
+    )
+
     parser.add_argument(
         '--output', '-o',
         default='downloads',
@@ -267,8 +529,8 @@ Examples:
 
     args = parser.parse_args()
 
-    # Interactive mode if no URL provided
-    if not args.url:
+    # Interactive mode if no URL (or manifest) provided
+    if not args.url and not args.from_links:
         try:
             interactive_mode()
         except KeyboardInterrupt:
@@ -0,0 +1,217 @@
+"""
+Persistent manifest of downloaded files
+
+Each output directory keeps a small SQLite database keyed by URL that records
+the filename a URL was saved under, its size, HTTP validators and checksum.
+Skip decisions become single indexed lookups that survive restarts, and two
+URLs with the same basename no longer collide.
+"""
+
+import os
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+from urlnorm import canonicalize_url
+
+
+MANIFEST_FILENAME = ".manifest.sqlite"
+
+
+class DownloadManifest:
+    """URL-keyed record of the files stored in an output directory"""
+
+    def __init__(self,
+                 output_dir: str,
+                 filename: str = MANIFEST_FILENAME,
+                 canonicalizer: Optional[Callable[[str], str]] = None):
+        """
+        Open (or create) the manifest of an output directory
+
+        Args:
+            output_dir: Directory the downloaded files live in
+            filename: Name of the manifest database inside output_dir
+            canonicalizer: Function turning a URL into its manifest key
+                           (defaults to urlnorm.canonicalize_url)
+        """
+        self.output_dir = output_dir
+        self.canonicalize = canonicalizer or canonicalize_url
+        self.path = os.path.join(output_dir, filename)
+        self._lock = threading.Lock()
+        self._claimed = {}
+
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                url TEXT PRIMARY KEY,
+                filename TEXT NOT NULL,
+                size INTEGER,
+                etag TEXT,
+                last_modified TEXT,
+                sha256 TEXT,
+                completed_at REAL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS files_filename ON files (filename)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS files_sha256 ON files (sha256)")
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        Look up the record of a URL
+
+        Args:
+            url: File URL
+
+        Returns:
+            Dictionary with url, filename, size, etag, last_modified, sha256
+            and completed_at keys, or None if the URL is unknown
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, filename, size, etag, last_modified, sha256, completed_at "
+                "FROM files WHERE url = ?", (self.canonicalize(url),)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return dict(zip(('url', 'filename', 'size', 'etag', 'last_modified', 'sha256', 'completed_at'), row))
+
+    def is_complete(self, url: str) -> bool:
+        """
+        Check whether a URL was fully downloaded and its file is still intact
+
+        Args:
+            url: File URL
+
+        Returns:
+            True if the recorded file exists with the recorded size
+        """
+        entry = self.get(url)
+        if not entry or entry['completed_at'] is None:
+            return False
+
+        try:
+            return os.path.getsize(os.path.join(self.output_dir, entry['filename'])) == entry['size']
+        except OSError:
+            return False
+
+    def find_by_sha256(self, sha256: str, exclude_url: Optional[str] = None) -> Optional[Dict]:
+        """
+        Find an intact file that already holds the given content
+
+        Args:
+            sha256: Hex SHA-256 digest of the content
+            exclude_url: URL whose own record should be ignored
+
+        Returns:
+            Record of a matching file, or None
+        """
+        exclude = self.canonicalize(exclude_url) if exclude_url else None
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, filename, size FROM files WHERE sha256 = ? AND completed_at IS NOT NULL",
+                (sha256,)
+            ).fetchall()
+
+        for url, filename, size in rows:
+            if url == exclude:
+                continue
+            try:
+                if os.path.getsize(os.path.join(self.output_dir, filename)) == size:
+                    return {'url': url, 'filename': filename, 'size': size}
+            except OSError:
+                continue
+        return None
+
+    def claim_filename(self, url: str, preferred: str) -> str:
+        """
+        Choose the filename a URL is saved under
+
+        A URL keeps the name it was given in earlier runs. A new URL gets the
+        preferred name unless another URL already owns it, in which case a
+        short hash of the URL is appended. A file with the preferred name that
+        predates the manifest is adopted as this URL's download.
+
+        Args:
+            url: File URL
+            preferred: Sanitized filename derived from the URL
+
+        Returns:
+            Filename to use inside the output directory
+        """
+        key = self.canonicalize(url)
+
+        with self._lock:
+            row = self._conn.execute("SELECT filename FROM files WHERE url = ?", (key,)).fetchone()
+            if row:
+                return row[0]
+
+            owner = self._conn.execute(
+                "SELECT url FROM files WHERE filename = ?", (preferred,)
+            ).fetchone()
+
+            if owner is None and self._claimed.get(preferred, key) == key:
+                path = os.path.join(self.output_dir, preferred)
+                if os.path.isfile(path):
+                    # Downloaded before the manifest existed
+                    self._conn.execute(
+                        "INSERT INTO files (url, filename, size, completed_at) VALUES (?, ?, ?, ?)",
+                        (key, preferred, os.path.getsize(path), os.path.getmtime(path))
+                    )
+                    self._conn.commit()
+                else:
+                    self._claimed[preferred] = key
+                return preferred
+
+            name, ext = os.path.splitext(preferred)
+            filename = f"{name}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:8]}{ext}"
+            self._claimed[filename] = key
+            return filename
+
+    def release_filename(self, url: str, filename: str):
+        """
+        Give up the claim on a filename whose download failed
+
+        Args:
+            url: File URL
+            filename: Name returned by claim_filename
+        """
+        key = self.canonicalize(url)
+        with self._lock:
+            if self._claimed.get(filename) == key:
+                del self._claimed[filename]
+
+    def record(self,
+               url: str,
+               filename: str,
+               size: int,
+               etag: Optional[str] = None,
+               last_modified: Optional[str] = None,
+               sha256: Optional[str] = None):
+        """
+        Record a completed download
+
+        Args:
+            url: File URL
+            filename: Name of the file inside the output directory
+            size: File size in bytes
+            etag: ETag response header
+            last_modified: Last-Modified response header
+            sha256: Hex SHA-256 digest of the content
+        """
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (url, filename, size, etag, last_modified, sha256, completed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.canonicalize(url), filename, size, etag, last_modified, sha256, time.time())
+            )
+            self._conn.commit()
+            # The database owns the name from now on; claims only cover downloads in flight
+            self._claimed.pop(filename, None)
+
+    def close(self):
+        """Close the underlying database"""
+        with self._lock:
+            self._conn.close()
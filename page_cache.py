@@ -0,0 +1,123 @@
+"""
+On-disk HTTP cache for scraped pages
+
+Stores the ETag/Last-Modified validators of each fetched page together with
+the data extracted from it, so a later scrape can send a conditional GET and
+reuse the extracted results on a 304 without reparsing the page.
+"""
+
+import os
+import json
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+class PageCache:
+    """Size-bounded LRU cache of extracted page data keyed by URL"""
+
+    def __init__(self,
+                 path: str = ".scraper_cache/pages.sqlite",
+                 max_entries: int = 5000,
+                 max_bytes: int = 100 * 1024 * 1024):
+        """
+        Initialize cache
+
+        Args:
+            path: SQLite file holding the cache
+            max_entries: Maximum number of cached pages
+            max_bytes: Maximum total size of the cached data in bytes
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                data TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                accessed REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed)")
+        self._conn.commit()
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        Look up a cached page
+
+        Args:
+            url: Page URL
+
+        Returns:
+            Dictionary with 'etag', 'last_modified' and 'data' keys, or None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, data FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._conn.execute("UPDATE pages SET accessed = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+
+        return {'etag': row[0], 'last_modified': row[1], 'data': json.loads(row[2])}
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], data: Dict):
+        """
+        Store the validators and extracted data of a page
+
+        Args:
+            url: Page URL
+            etag: ETag response header
+            last_modified: Last-Modified response header
+            data: JSON-serializable extracted data
+        """
+        payload = json.dumps(data)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, etag, last_modified, data, size, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, payload, len(payload), time.time())
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Drop least recently used pages until the cache fits its limits"""
+        count, size = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages"
+        ).fetchone()
+        if count <= self.max_entries and size <= self.max_bytes:
+            return
+
+        for url, entry_size in self._conn.execute(
+                "SELECT url, size FROM pages ORDER BY accessed").fetchall():
+            if count <= self.max_entries and size <= self.max_bytes:
+                break
+            self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+            count -= 1
+            size -= entry_size
+
+    def clear(self):
+        """Remove all cached pages"""
+        with self._lock:
+            self._conn.execute("DELETE FROM pages")
+            self._conn.commit()
+
+    def close(self):
+        """Close the underlying database"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,110 @@
+"""
+Pagination URL template inference
+
+Given the page links found in a listing's navigation, work out the URL
+template with a {page} placeholder (e.g. "https://example.com/docs/page/{page}/")
+and the highest page number that is visible.
+"""
+
+import re
+from collections import defaultdict
+from typing import Iterable, List, Optional, Tuple
+
+
+# Common page-number positions, used when only one numbered page link is visible
+KNOWN_PAGE_PATTERNS = [
+    re.compile(r'/page/(\d+)'),
+    re.compile(r'[?&](?:page|paged|pg|p)=(\d+)'),
+]
+
+# Loose check for URLs that look like listing pages
+PAGE_URL_RE = re.compile(r'/page/\d+|[\?&]page=\d+|\d+/?$')
+
+# Page number at the end of a listing page's path ("/docs/page/3/", "/news/3")
+PAGE_PATH_SUFFIX_RE = re.compile(r'(?:/page)?/\d+/?$')
+
+
+def _escape(text: str) -> str:
+    """Escape literal braces so text can be used in a str.format template"""
+    return text.replace('{', '{{').replace('}', '}}')
+
+
+def _unescape(text: str) -> str:
+    return text.replace('{{', '{').replace('}}', '}')
+
+
+def infer_page_template(urls: Iterable[str]) -> Optional[Tuple[str, int]]:
+    """
+    Infer the {page} template of a paginated listing
+
+    URLs are grouped by their non-numeric skeleton; within the largest group
+    the one numeric position that differs between URLs is the page number.
+    Unrelated numeric links (dates, IDs) end up in other groups and are ignored.
+
+    Args:
+        urls: Page URLs found in pagination elements
+
+    Returns:
+        Tuple of (template, highest visible page number), or None
+    """
+    groups = defaultdict(list)
+    for url in set(urls):
+        parts = re.split(r'(\d+)', url)
+        if len(parts) > 1:
+            groups[tuple(parts[0::2])].append(parts)
+
+    best = None
+    for members in groups.values():
+        positions = range(1, len(members[0]), 2)
+
+        if len(members) > 1:
+            varying = [i for i in positions if len({int(m[i]) for m in members}) > 1]
+            if len(varying) != 1:
+                continue
+            index = varying[0]
+        else:
+            index = _known_page_position(members[0])
+            if index is None:
+                continue
+
+        parts = members[0]
+        template = (_escape(''.join(parts[:index])) + '{page}' + _escape(''.join(parts[index + 1:])))
+        highest = max(int(m[index]) for m in members)
+
+        if best is None or len(members) > best[2]:
+            best = (template, highest, len(members))
+
+    if best is None:
+        return None
+    return best[0], best[1]
+
+
+def _known_page_position(parts: List[str]) -> Optional[int]:
+    """Find which numeric part of a split URL sits at a known page-number position"""
+    url = ''.join(parts)
+    for pattern in KNOWN_PAGE_PATTERNS:
+        match = pattern.search(url)
+        if not match:
+            continue
+
+        # Map the character offset of the number back to its index in parts
+        offset = 0
+        for i, part in enumerate(parts):
+            if offset == match.start(1) and i % 2 == 1:
+                return i
+            offset += len(part)
+    return None
+
+
+def template_regex(template: str) -> re.Pattern:
+    """
+    Build a regex matching URLs generated from a template
+
+    Args:
+        template: URL template with a {page} placeholder
+
+    Returns:
+        Compiled regex whose first group is the page number
+    """
+    prefix, _, suffix = template.partition('{page}')
+    return re.compile(re.escape(_unescape(prefix)) + r'(\d+)' + re.escape(_unescape(suffix)) + '$')
@@ -0,0 +1,314 @@
+"""
+Link probing
+
+Links such as "download.php?id=123" or "/files/get/456" carry no file
+extension, so the scraper cannot tell from the URL whether they point to a
+document. LinkProber asks the server instead: a HEAD request (or a one-byte
+ranged GET when HEAD is refused) reveals the Content-Type, Content-Disposition
+and size without transferring the body. Results are cached per URL for a
+configurable time so repeated scrapes do not probe again.
+"""
+
+import os
+import json
+import time
+import hashlib
+import mimetypes
+import sqlite3
+import threading
+import requests
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from email.message import Message
+from urllib.parse import urlparse, unquote
+from typing import Dict, Iterable, Optional
+from throttle import HostConnectionLimiter, RateLimiter
+
+
+# Content types whose usual extension differs from (or is missing in) mimetypes
+CONTENT_TYPE_EXTENSIONS = {
+    'application/pdf': 'pdf',
+    'application/msword': 'doc',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': 'docx',
+    'application/vnd.ms-excel': 'xls',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet': 'xlsx',
+    'application/vnd.ms-powerpoint': 'ppt',
+    'application/vnd.openxmlformats-officedocument.presentationml.presentation': 'pptx',
+    'application/zip': 'zip',
+    'application/x-zip-compressed': 'zip',
+    'application/x-rar-compressed': 'rar',
+    'application/vnd.rar': 'rar',
+    'application/x-7z-compressed': '7z',
+    'application/gzip': 'gz',
+    'application/x-tar': 'tar',
+    'text/csv': 'csv',
+    'text/plain': 'txt',
+    'application/json': 'json',
+    'application/xml': 'xml',
+    'text/xml': 'xml',
+    'image/jpeg': 'jpg',
+    'image/png': 'png',
+    'image/gif': 'gif',
+    'image/svg+xml': 'svg',
+    'audio/mpeg': 'mp3',
+    'video/mp4': 'mp4',
+    'video/quicktime': 'mov',
+}
+
+# Content types of web pages rather than files
+PAGE_CONTENT_TYPES = {'text/html', 'application/xhtml+xml'}
+
+
+def _disposition_filename(disposition: str) -> Optional[str]:
+    """Filename from a Content-Disposition header (RFC 5987 filename* understood)"""
+    if not disposition:
+        return None
+
+    message = Message()
+    message['Content-Disposition'] = disposition
+    filename = message.get_filename()
+    return os.path.basename(filename.replace('\\', '/')) if filename else None
+
+
+def classify_response(url: str, headers) -> Optional[Dict]:
+    """
+    Classify a probe response by its headers
+
+    Args:
+        url: Probed URL
+        headers: Response headers
+
+    Returns:
+        Dictionary with 'extension', 'content_type', 'size' and 'filename' keys,
+        or None if the URL serves a web page
+    """
+    content_type = (headers.get('Content-Type') or '').split(';')[0].strip().lower()
+    disposition = headers.get('Content-Disposition') or ''
+    filename = _disposition_filename(disposition)
+    attachment = disposition.lower().startswith('attachment')
+
+    if content_type in PAGE_CONTENT_TYPES and not attachment:
+        return None
+
+    extension = ''
+    if filename and '.' in filename:
+        extension = filename.rsplit('.', 1)[-1].lower()
+    if not extension and content_type:
+        extension = CONTENT_TYPE_EXTENSIONS.get(content_type) or \
+            (mimetypes.guess_extension(content_type) or '').lstrip('.')
+    if not extension and not attachment:
+        return None
+
+    # Total size: from Content-Range on a ranged GET, else Content-Length
+    size = None
+    content_range = headers.get('Content-Range') or ''
+    if '/' in content_range and content_range.rsplit('/', 1)[-1].isdigit():
+        size = int(content_range.rsplit('/', 1)[-1])
+    elif (headers.get('Content-Length') or '').isdigit():
+        size = int(headers['Content-Length'])
+
+    return {
+        'extension': extension,
+        'content_type': content_type,
+        'size': size,
+        'filename': filename or suggest_filename(url, extension),
+    }
+
+
+def suggest_filename(url: str, extension: str) -> str:
+    """
+    Build a stable filename for a URL whose path does not name the file
+
+    Args:
+        url: File URL
+        extension: Extension detected for the file
+
+    Returns:
+        Filename like "download_<hash>.pdf" (the hash keeps names of
+        different query strings apart)
+    """
+    parsed = urlparse(url)
+    stem = os.path.splitext(os.path.basename(unquote(parsed.path)))[0] or parsed.netloc.replace('www.', '')
+    digest = hashlib.sha1(url.encode('utf-8')).hexdigest()[:10]
+    return f"{stem}_{digest}.{extension}" if extension else f"{stem}_{digest}"
+
+
+class ProbeCache:
+    """Per-URL cache of probe results with a time to live"""
+
+    def __init__(self, ttl: float = 24 * 3600, max_entries: int = 10000, path: Optional[str] = None):
+        """
+        Initialize cache
+
+        Args:
+            ttl: Seconds a probe result stays valid
+            max_entries: Maximum number of results kept in memory
+            path: Optional SQLite file so results survive restarts
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS probes (
+                    url TEXT PRIMARY KEY,
+                    result TEXT,
+                    expires REAL NOT NULL
+                )
+            """)
+            self._conn.commit()
+
+    def get(self, url: str):
+        """
+        Look up a probe result
+
+        Args:
+            url: Probed URL
+
+        Returns:
+            Tuple of (found, result); result may be None for URLs known not to be files
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(url)
+            if entry is None and self._conn is not None:
+                row = self._conn.execute("SELECT result, expires FROM probes WHERE url = ?", (url,)).fetchone()
+                if row:
+                    entry = (json.loads(row[0]), row[1])
+                    self._remember(url, entry)
+
+            if entry is None or entry[1] < now:
+                return False, None
+            self._entries.move_to_end(url)
+            return True, entry[0]
+
+    def put(self, url: str, result: Optional[Dict]):
+        """
+        Store a probe result
+
+        Args:
+            url: Probed URL
+            result: Result of classify_response (None for web pages)
+        """
+        entry = (result, time.time() + self.ttl)
+        with self._lock:
+            self._remember(url, entry)
+            if self._conn is not None:
+                self._conn.execute("INSERT OR REPLACE INTO probes (url, result, expires) VALUES (?, ?, ?)",
+                                   (url, json.dumps(result), entry[1]))
+                self._conn.commit()
+
+    def _remember(self, url: str, entry):
+        self._entries[url] = entry
+        self._entries.move_to_end(url)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def close(self):
+        """Close the underlying database, if any"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class LinkProber:
+    """Classifies URLs by probing their headers concurrently"""
+
+    # HEAD answers that mean "ask again with GET"
+    HEAD_UNSUPPORTED = {403, 405, 501}
+
+    def __init__(self,
+                 session: Optional[requests.Session] = None,
+                 timeout: int = 15,
+                 max_workers: int = 8,
+                 cache: Optional[ProbeCache] = None,
+                 host_limiter: Optional[HostConnectionLimiter] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
+        """
+        Initialize prober
+
+        Args:
+            session: requests Session to send probes with
+            timeout: Request timeout in seconds
+            max_workers: Number of probes sent concurrently
+            cache: ProbeCache holding earlier results (a fresh one by default)
+            host_limiter: Optional HostConnectionLimiter shared with the scraper
+            rate_limiter: Optional RateLimiter shared with the scraper
+        """
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self.max_workers = max(1, max_workers)
+        self.cache = cache or ProbeCache()
+        self.host_limiter = host_limiter or HostConnectionLimiter()
+        self.rate_limiter = rate_limiter or RateLimiter()
+
+    def probe(self, url: str) -> Optional[Dict]:
+        """
+        Classify a single URL
+
+        Args:
+            url: URL to probe
+
+        Returns:
+            Classification as returned by classify_response, or None if the URL
+            is a web page or could not be probed
+        """
+        found, result = self.cache.get(url)
+        if found:
+            return result
+
+        try:
+            result = classify_response(url, self._fetch_headers(url))
+        except requests.HTTPError as e:
+            print(f"Error probing {url}: {e}")
+            if e.response is not None and e.response.status_code >= 500:
+                return None
+            # Client errors are definite answers and are cached like web pages
+            result = None
+        except requests.RequestException as e:
+            print(f"Error probing {url}: {e}")
+            # Network failures are not cached; the next scrape tries again
+            return None
+
+        self.cache.put(url, result)
+        return result
+
+    def probe_many(self, urls: Iterable[str]) -> Dict[str, Optional[Dict]]:
+        """
+        Classify several URLs concurrently
+
+        Args:
+            urls: URLs to probe
+
+        Returns:
+            Dictionary mapping each URL to its classification (or None)
+        """
+        urls = list(dict.fromkeys(urls))
+        if len(urls) <= 1 or self.max_workers == 1:
+            return {url: self.probe(url) for url in urls}
+
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(urls))) as executor:
+            return dict(zip(urls, executor.map(self.probe, urls)))
+
+    def _fetch_headers(self, url: str):
+        """Headers of a HEAD request, or of a one-byte ranged GET when HEAD is refused"""
+        with self.host_limiter.slot(url):
+            self.rate_limiter.acquire(url)
+            response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+            if response.status_code not in self.HEAD_UNSUPPORTED and response.headers.get('Content-Type'):
+                response.raise_for_status()
+                return response.headers
+
+            self.rate_limiter.acquire(url)
+            with self.session.get(url, timeout=self.timeout, stream=True,
+                                  headers={'Range': 'bytes=0-0'}) as response:
+                response.raise_for_status()
+                return response.headers
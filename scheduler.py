@@ -0,0 +1,270 @@
+"""
+Shared download queue for the web app
+
+All download jobs feed one fixed-size pool of worker threads. Jobs are served
+round-robin one file at a time, so a 5,000-file job cannot starve a 5-file
+job submitted after it. The queue has depth limits; when it is full,
+submit() raises QueueFullError with an estimate of when to retry.
+"""
+
+import math
+import functools
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+from downloader import FileDownloader
+from throttle import HostConnectionLimiter, RateLimiter
+
+
+class QueueFullError(Exception):
+    """Raised when a job does not fit in the download queue"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _QueuedJob:
+    """Pending files and bookkeeping of one submitted job"""
+
+    def __init__(self, job_id, links, downloader, callbacks):
+        self.job_id = job_id
+        self.pending = deque(links)
+        self.total = len(links)
+        self.downloader = downloader
+        self.on_start = callbacks.get('on_start')
+        self.on_file_start = callbacks.get('on_file_start')
+        self.on_progress = callbacks.get('on_progress')
+        self.on_file = callbacks.get('on_file')
+        self.on_done = callbacks.get('on_done')
+        self.started = False
+        self.finished = 0
+        self.results = {'total': self.total, 'successful': 0, 'skipped': 0, 'failed': 0,
+                        'failed_urls': [], 'deduplicated': 0, 'files': []}
+
+
+class DownloadScheduler:
+    """Fixed-size worker pool serving download jobs fairly"""
+
+    def __init__(self,
+                 num_workers: int = 8,
+                 max_queued_files: int = 20000,
+                 max_jobs: int = 100,
+                 max_per_host: int = 4,
+                 rate_limiter: Optional[RateLimiter] = None):
+        """
+        Initialize scheduler (workers start with the first job)
+
+        Args:
+            num_workers: Number of files downloaded at the same time across all jobs
+            max_queued_files: Maximum number of files waiting to be downloaded
+            max_jobs: Maximum number of unfinished jobs
+            max_per_host: Maximum simultaneous downloads from a single host across all jobs
+            rate_limiter: Per-host RateLimiter shared by the jobs' downloaders
+                          (default: unlimited)
+        """
+        self.num_workers = max(1, num_workers)
+        self.max_queued_files = max_queued_files
+        self.max_jobs = max_jobs
+        self.host_limiter = HostConnectionLimiter(max_per_host)
+        self.rate_limiter = rate_limiter or RateLimiter()
+
+        self._jobs: Dict[str, _QueuedJob] = {}
+        self._rotation = deque()  # IDs of jobs with pending files, in serving order
+        self._queued_files = 0
+        self._condition = threading.Condition()
+        self._workers: List[threading.Thread] = []
+
+        # Smoothed files-per-second, used for Retry-After estimates
+        self._throughput = None
+        self._last_finish = None
+
+    def submit(self,
+               job_id: str,
+               links: List[Dict[str, str]],
+               downloader: FileDownloader,
+               on_start: Optional[Callable] = None,
+               on_file_start: Optional[Callable] = None,
+               on_progress: Optional[Callable] = None,
+               on_file: Optional[Callable] = None,
+               on_done: Optional[Callable] = None,
+               force: bool = False):
+        """
+        Queue the files of a job
+
+        Args:
+            job_id: Unique job ID
+            links: Link dictionaries to download
+            downloader: FileDownloader the job's files are downloaded with
+            on_start: Optional callback function() run when the first file starts
+            on_file_start: Optional callback function(link) run when a file starts
+            on_progress: Optional callback function(link, current, total) run
+                         while a file is streamed (total is 0 if unknown)
+            on_file: Optional callback function(link, result) run after each file,
+                     with the result dictionary of FileDownloader.download_link
+            on_done: Optional callback function(results) run after the last file,
+                     with the same statistics as FileDownloader.download_batch
+            force: Queue the job even if the limits are reached (used for jobs
+                   recovered after a restart)
+
+        Raises:
+            QueueFullError: If the job does not fit in the queue
+        """
+        with self._condition:
+            if not force:
+                self._check_capacity(len(links))
+
+            queued = _QueuedJob(job_id, links, downloader, {
+                'on_start': on_start, 'on_file_start': on_file_start, 'on_progress': on_progress,
+                'on_file': on_file, 'on_done': on_done,
+            })
+            self._jobs[job_id] = queued
+            if queued.pending:
+                self._rotation.append(job_id)
+                self._queued_files += queued.total
+            self._start_workers()
+            self._condition.notify_all()
+
+        if not links:
+            self._finish(queued)
+
+    def new_downloader(self, output_dir: str, rate_limiter: Optional[RateLimiter] = None) -> FileDownloader:
+        """
+        Build a FileDownloader for a job, sharing the scheduler's per-host limits
+
+        Args:
+            output_dir: Directory the job's files are saved to
+            rate_limiter: Optional RateLimiter of the job replacing the shared one
+
+        Returns:
+            FileDownloader to pass to submit()
+        """
+        return FileDownloader(output_dir=output_dir,
+                              host_limiter=self.host_limiter,
+                              rate_limiter=rate_limiter or self.rate_limiter)
+
+    def check_capacity(self, files: int):
+        """
+        Check whether a job of the given size would be accepted now
+
+        Lets callers reject a job before preparing anything for it; submit()
+        checks again.
+
+        Args:
+            files: Number of files of the job
+
+        Raises:
+            QueueFullError: If the job does not fit in the queue
+        """
+        with self._condition:
+            self._check_capacity(files)
+
+    def _check_capacity(self, files: int):
+        """Raise QueueFullError if a job of `files` files does not fit (call with the condition held)"""
+        if len(self._jobs) >= self.max_jobs:
+            raise QueueFullError("Too many download jobs in progress", self._retry_after(1))
+        # A job larger than the whole queue is still accepted once the queue is empty
+        overflow = self._queued_files + files - self.max_queued_files
+        if overflow > 0 and self._queued_files:
+            raise QueueFullError("Download queue is full", self._retry_after(overflow))
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Current queue state
+
+        Returns:
+            Dictionary with 'jobs', 'queued_files' and 'workers'
+        """
+        with self._condition:
+            return {'jobs': len(self._jobs), 'queued_files': self._queued_files, 'workers': self.num_workers}
+
+    def _start_workers(self):
+        while len(self._workers) < self.num_workers:
+            worker = threading.Thread(target=self._work, daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _next_file(self):
+        """Block until a file is pending, then take one from the next job in turn"""
+        with self._condition:
+            while not self._rotation:
+                self._condition.wait()
+
+            job_id = self._rotation.popleft()
+            queued = self._jobs[job_id]
+            link = queued.pending.popleft()
+            self._queued_files -= 1
+            if queued.pending:
+                self._rotation.append(job_id)
+
+            first = not queued.started
+            queued.started = True
+            return queued, link, first
+
+    def _work(self):
+        while True:
+            queued, link, first = self._next_file()
+
+            progress_callback = functools.partial(queued.on_progress, link) if queued.on_progress else None
+
+            # A failing callback or download fails this file only; the worker must survive
+            try:
+                if first and queued.on_start:
+                    queued.on_start()
+                if queued.on_file_start:
+                    queued.on_file_start(link)
+                result = queued.downloader.download_link(link, progress_callback)
+            except Exception as e:
+                print(f"Error downloading {link.get('url')}: {e}")
+                result = {'url': link.get('url'), 'status': 'failed', 'filename': None,
+                          'size': None, 'sha256': None, 'duplicate_of': None}
+
+            self._record(queued, link, result)
+
+    def _record(self, queued: _QueuedJob, link: Dict[str, str], result: Dict):
+        status = result['status']
+        with self._condition:
+            results = queued.results
+            results[status] += 1
+            if status == 'failed':
+                results['failed_urls'].append(link.get('url'))
+            if result['duplicate_of']:
+                results['deduplicated'] += 1
+            results['files'].append({key: result[key] for key in
+                                     ('url', 'filename', 'status', 'size', 'sha256', 'duplicate_of')})
+            queued.finished += 1
+            done = queued.finished == queued.total
+            self._update_throughput()
+
+        if queued.on_file:
+            try:
+                queued.on_file(link, result)
+            except Exception as e:
+                print(f"Error reporting {link.get('url')}: {e}")
+        if done:
+            self._finish(queued)
+
+    def _finish(self, queued: _QueuedJob):
+        with self._condition:
+            self._jobs.pop(queued.job_id, None)
+        try:
+            queued.downloader.manifest.close()
+            if queued.on_done:
+                queued.on_done(queued.results)
+        except Exception as e:
+            print(f"Error finishing download job {queued.job_id}: {e}")
+
+    def _update_throughput(self):
+        """Exponentially weighted files-per-second (call with the condition held)"""
+        now = time.monotonic()
+        if self._last_finish is not None:
+            elapsed = max(now - self._last_finish, 1e-3)
+            rate = 1 / elapsed
+            self._throughput = rate if self._throughput is None else 0.9 * self._throughput + 0.1 * rate
+        self._last_finish = now
+
+    def _retry_after(self, files: int) -> int:
+        """Seconds until roughly `files` queued files have been drained (call with the condition held)"""
+        throughput = self._throughput or self.num_workers / 2
+        return max(1, min(300, math.ceil(files / throughput)))
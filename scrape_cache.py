@@ -0,0 +1,179 @@
+"""
+Cache of scrape results for the web app
+
+Users scraping the same listing with the same options within a short time
+get the earlier result back instead of re-crawling every page. Results are
+keyed by the normalized scrape parameters, kept in an in-memory LRU with a
+time to live, and optionally in a SQLite file that several server processes
+(e.g. gunicorn workers) can share.
+"""
+
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from urlnorm import canonicalize_url
+
+
+def _normalize_page_range(page_range: str) -> str:
+    """'3, 1-2,2' -> '1-3' (the same pages in any spelling give the same key)"""
+    pages = set()
+    for part in str(page_range).split(','):
+        part = part.strip()
+        if '-' in part:
+            start, end = part.split('-', 1)
+            pages.update(range(int(start), int(end) + 1))
+        elif part:
+            pages.add(int(part))
+
+    ranges = []
+    for page in sorted(pages):
+        if ranges and page == ranges[-1][1] + 1:
+            ranges[-1][1] = page
+        else:
+            ranges.append([page, page])
+    return ','.join(f'{start}-{end}' if start != end else str(start) for start, end in ranges)
+
+
+def scrape_cache_key(data: Dict) -> str:
+    """
+    Build the cache key of a scrape request
+
+    Only fields that change the result are part of the key: the canonical URL,
+    the pagination mode with its own options, the extension filter and
+    probing. Worker counts and rate limits are ignored.
+
+    Args:
+        data: Scrape request fields
+
+    Returns:
+        Hex digest identifying the request
+
+    Raises:
+        ValueError: If a numeric field cannot be parsed
+    """
+    mode = data.get('pagination_mode', 'single')
+    params = {
+        'url': canonicalize_url(data['url']),
+        'mode': mode,
+        'extensions': sorted({ext.lower().replace('.', '') for ext in data.get('extensions') or []}),
+        'probe': bool(data.get('probe')),
+    }
+
+    if mode == 'manual':
+        params['url_pattern'] = data.get('url_pattern') or data['url']
+        params['page_range'] = _normalize_page_range(data.get('page_range', '1'))
+    elif mode == 'crawl':
+        params['max_depth'] = int(data.get('max_depth', 2))
+        params['max_pages'] = int(data.get('max_pages', 200))
+        params['scope'] = data.get('scope', 'domain')
+
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class ScrapeCache:
+    """LRU cache of scrape results with a time to live"""
+
+    def __init__(self, ttl: float = 600, max_entries: int = 100, path: Optional[str] = None):
+        """
+        Initialize cache
+
+        Args:
+            ttl: Seconds a scrape result stays valid
+            max_entries: Maximum number of results kept in memory
+            path: Optional SQLite file shared by several processes
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+
+        if path:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS scrapes (
+                    key TEXT PRIMARY KEY,
+                    links TEXT NOT NULL,
+                    expires REAL NOT NULL
+                )
+            """)
+            self._conn.commit()
+
+    def get(self, key: str) -> Optional[List[Dict[str, str]]]:
+        """
+        Look up a scrape result and count the hit or miss
+
+        Args:
+            key: Key from scrape_cache_key
+
+        Returns:
+            Cached links, or None if missing or expired
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if (entry is None or entry[1] < now) and self._conn is not None:
+                # Another process may have stored a fresher result
+                row = self._conn.execute("SELECT links, expires FROM scrapes WHERE key = ?", (key,)).fetchone()
+                if row and row[1] >= now:
+                    entry = (json.loads(row[0]), row[1])
+                    self._remember(key, entry)
+
+            if entry is None or entry[1] < now:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: str, links: List[Dict[str, str]]):
+        """
+        Store a scrape result
+
+        Args:
+            key: Key from scrape_cache_key
+            links: Links the scrape returned
+        """
+        entry = (links, time.time() + self.ttl)
+        with self._lock:
+            self._remember(key, entry)
+            if self._conn is not None:
+                self._conn.execute("INSERT OR REPLACE INTO scrapes (key, links, expires) VALUES (?, ?, ?)",
+                                   (key, json.dumps(links), entry[1]))
+                self._conn.execute("DELETE FROM scrapes WHERE expires < ?", (time.time(),))
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Counters of this process
+
+        Returns:
+            Dictionary with 'hits', 'misses' and 'entries' (in memory)
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+    def _remember(self, key: str, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def close(self):
+        """Close the underlying database, if any"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
@@ -2,11 +2,21 @@
 Web scraper module for extracting downloadable links from any webpage
 """
 
+import queue
+import threading
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
 from urllib.parse import urljoin, urlparse, urlunparse
-import re
-from typing import List, Set, Dict
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from throttle import HostConnectionLimiter, RateLimiter
+from page_cache import PageCache
+from extractors import get_extractor
+from pagination import PAGE_PATH_SUFFIX_RE, PAGE_URL_RE, infer_page_template, template_regex
+from seen import SEEN_BACKENDS, make_seen_set, unique_links
+from urlnorm import URLCanonicalizer
+from probe import LinkProber, ProbeCache
 
 
 class LinkScraper:
@@ -22,21 +32,81 @@ class LinkScraper:
         'exe', 'dmg', 'apk', 'deb', 'rpm'
     }
 
-    def __init__(self, base_url: str, timeout: int = 30):
+    # Extensions of links that may serve a file without saying so (probed when enabled)
+    PROBE_EXTENSIONS = {'', 'php', 'asp', 'aspx', 'jsp', 'cgi', 'ashx', 'do', 'action'}
+
+    def __init__(self,
+                 base_url: str,
+                 timeout: int = 30,
+                 max_workers: int = 1,
+                 max_per_host: int = 4,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 page_cache: Optional[PageCache] = None,
+                 engine: str = 'auto',
+                 seen_backend: str = 'memory',
+                 seen_options: Optional[Dict[str, Any]] = None,
+                 canonicalizer: Optional[URLCanonicalizer] = None,
+                 probe: bool = False,
+                 probe_cache: Optional[ProbeCache] = None):
         """
         Initialize scraper
 
         Args:
             base_url: The base URL of the website
             timeout: Request timeout in seconds
+            max_workers: Number of pages fetched concurrently (1 = sequential)
+            max_per_host: Maximum simultaneous connections to a single host
+            rate_limiter: Optional shared per-host RateLimiter (None = unlimited)
+            page_cache: Optional PageCache used for conditional page fetches
+            engine: HTML extraction engine: 'lxml', 'html.parser' or 'auto'
+                    (lxml when installed)
+            seen_backend: Seen-set used to de-duplicate the links of a scrape:
+                          'memory', 'hashed', 'bloom' or 'sqlite'
+            seen_options: Options for the seen-set backend; a 'path' for
+                          'sqlite' keeps the links seen across runs, so later
+                          runs only return new links
+            canonicalizer: URLCanonicalizer applied to every extracted URL
+                           (defaults to stripping tracking parameters,
+                           sorting the query and dropping fragments)
+            probe: Send HEAD requests to extensionless and script links to
+                   find files served without a recognizable extension
+            probe_cache: Optional ProbeCache shared between scrapers, so
+                         repeated scrapes reuse earlier probe results
         """
         self.base_url = base_url
         self.timeout = timeout
+        self.max_workers = max(1, max_workers)
+        self.host_limiter = HostConnectionLimiter(max_per_host)
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.page_cache = page_cache
+        self.extractor = get_extractor(engine)
+        self.seen_backend = seen_backend
+        self.seen_options = dict(seen_options or {})
+        self.canonicalizer = canonicalizer or URLCanonicalizer()
+        # Pages that could not be fetched; a result with errors is incomplete
+        self.fetch_errors = 0
+        self._errors_lock = threading.Lock()
+        if seen_backend not in SEEN_BACKENDS:
+            raise ValueError(f"Unknown seen-set backend '{seen_backend}' (choose from {', '.join(SEEN_BACKENDS)})")
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
 
+        # Keep enough pooled connections around for the worker threads
+        adapter = HTTPAdapter(pool_maxsize=max(10, self.max_workers))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+        self.prober = None
+        if probe:
+            self.prober = LinkProber(session=self.session,
+                                     timeout=self.timeout,
+                                     max_workers=max(4, self.max_workers),
+                                     cache=probe_cache,
+                                     host_limiter=self.host_limiter,
+                                     rate_limiter=self.rate_limiter)
+
     def scrape_page(self, url: str, filter_extensions: Set[str] = None) -> List[Dict[str, str]]:
         """
         Scrape a single page for downloadable links
@@ -47,90 +117,387 @@ class LinkScraper:
                              If None, returns all downloadable files
 
         Returns:
-            List of dictionaries containing link info: {'url': str, 'text': str, 'extension': str}
+            List of dictionaries containing link info: {'url': str, 'text': str, 'extension': str};
+            links already in a persistent seen-set (seen_options 'path') are left out
         """
+        with self._new_seen_set('links') as seen:
+            return list(unique_links(self._scrape_page(url, filter_extensions), seen))
+
+    def _scrape_page(self, url: str, filter_extensions: Set[str] = None) -> List[Dict[str, str]]:
+        """Links of one page, without the seen-set (for callers that keep their own)"""
         try:
-            response = self.session.get(url, timeout=self.timeout)
-            response.raise_for_status()
+            links = self._fetch_document(url)['links']
 
-            soup = BeautifulSoup(response.content, 'html.parser')
-            links = []
-            seen_urls = set()
+            # Filter by extension if specified
+            if filter_extensions:
+                links = [link for link in links if link['extension'] in filter_extensions]
 
-            # Find all <a> tags with href
-            for tag in soup.find_all('a', href=True):
-                href = tag['href']
+            return links
 
-                # Get link text
-                link_text = tag.get_text(strip=True) or 'No description'
+        except requests.RequestException as e:
+            self._fetch_failed(url, e)
+            return []
 
-                # Normalize URL
-                full_url = urljoin(url, href)
+    def _fetch_document(self, url: str) -> Dict[str, List]:
+        """
+        Fetch a page once and extract everything the scraper needs from it
 
-                # Get extension
-                extension = self._get_extension(full_url)
+        Args:
+            url: URL to fetch
 
-                # Filter by extension if specified
-                if filter_extensions and extension not in filter_extensions:
-                    continue
+        Returns:
+            Dictionary with 'links' (downloadable link dictionaries),
+            'pagination' (all URLs linked from pagination elements), 'next'
+            (rel="next" URLs) and 'pages' (other http(s) links, canonicalized).
+            When probing is enabled, links found to serve files are moved from
+            'pages' to 'links'.
+
+        Raises:
+            requests.RequestException: On HTTP or network errors
+        """
+        document = self._fetch_extracted(url, 'document', self._extract_document)
+        if self.prober:
+            document = self._probe_candidates(document)
+        return document
 
-                # Only include downloadable files
-                if extension not in self.DOWNLOADABLE_EXTENSIONS:
-                    continue
+    def _probe_candidates(self, document: Dict[str, List]) -> Dict[str, List]:
+        """
+        Probe a document's candidate links and add those that serve files
 
-                # Avoid duplicates
-                if full_url in seen_urls:
-                    continue
+        Args:
+            document: Document as extracted from the page
 
-                seen_urls.add(full_url)
-                links.append({
-                    'url': full_url,
-                    'text': link_text,
-                    'extension': extension
-                })
+        Returns:
+            New document with the probed files appended to 'links' and
+            removed from 'pages'
+        """
+        candidates = document.get('candidates', [])
+        if not candidates:
+            return document
+
+        results = self.prober.probe_many(candidate_url for candidate_url, _ in candidates)
+
+        links = list(document['links'])
+        known = {link['url'] for link in links}
+        for candidate_url, text in candidates:
+            info = results.get(candidate_url)
+            if not info or candidate_url in known:
+                continue
+            known.add(candidate_url)
+            links.append({
+                'url': candidate_url,
+                'text': text or 'No description',
+                'extension': info['extension'],
+                'size': info['size'],
+                'filename': info['filename'],
+            })
+
+        pages = [page_url for page_url in document['pages'] if page_url not in known]
+        return dict(document, links=links, pages=pages)
+
+    def _extract_document(self, response: requests.Response, url: str) -> Dict[str, List]:
+        """
+        Parse a fetched page a single time and extract links and pagination
 
-            return links
+        Args:
+            response: Response of the page
+            url: URL the page was requested with (used to resolve relative links)
 
-        except requests.RequestException as e:
-            print(f"Error scraping {url}: {e}")
-            return []
+        Returns:
+            Same dictionary as _fetch_document
+        """
+        doc = self.extractor.parse(response.content)
+
+        anchors = list(self.extractor.iter_anchors(doc))
+        with self._new_seen_set('page_links', persistent=False) as seen:
+            links = list(self._iter_downloadable(anchors, url, seen))
+
+        # Everything else that could be an HTML page, for site crawling
+        pages = []
+        candidates = {}
+        downloadable = {link['url'] for link in links}
+        page_self = self.canonicalizer(url)
+        for href, text in anchors:
+            page_url = self.canonicalizer(href, base=url)
+            if page_url in downloadable or urlparse(page_url).scheme not in ('http', 'https'):
+                continue
+            extension = self._get_extension(page_url)
+            if extension in self.DOWNLOADABLE_EXTENSIONS:
+                continue
+            if page_url not in pages:
+                pages.append(page_url)
+
+            # Links that might still serve a file, for optional probing
+            if extension in self.PROBE_EXTENSIONS and page_url != page_self and page_url not in candidates:
+                candidates[page_url] = text
+
+        # Look for common pagination patterns
+        page_urls = set()
+        for href in self.extractor.iter_pagination_hrefs(doc):
+            page_urls.add(urljoin(url, href))
+
+        next_urls = []
+        for href in self.extractor.iter_next_hrefs(doc):
+            full_url = urljoin(url, href)
+            if full_url not in next_urls:
+                next_urls.append(full_url)
+
+        return {'links': links, 'pagination': sorted(page_urls), 'next': next_urls, 'pages': pages,
+                'candidates': [[candidate_url, text] for candidate_url, text in candidates.items()]}
+
+    def iter_links(self,
+                   url: str,
+                   filter_extensions: Set[str] = None,
+                   chunk_size: int = 64 * 1024) -> Iterator[Dict[str, str]]:
+        """
+        Stream a page and yield its downloadable links as they are parsed
+
+        The body is fed chunk by chunk into an incremental parser, so memory
+        stays bounded by the number of links rather than the page size, and the
+        first links are available before the download finishes. The page cache
+        is not used in this mode.
+
+        The page is read by a background thread, which holds the host's
+        connection slot only while the response is being read: a slow
+        consumer, or one that abandons the generator, never keeps the slot or
+        the connection busy. Links parsed ahead of the consumer wait in memory.
+
+        Args:
+            url: URL to scrape
+            filter_extensions: Set of file extensions to filter (e.g., {'pdf', 'doc'})
+            chunk_size: Number of bytes read from the connection at a time
+
+        Yields:
+            Link dictionaries: {'url': str, 'text': str, 'extension': str};
+            links already in a persistent seen-set (seen_options 'path') are left out
+        """
+        found = queue.Queue()
+        finished = object()
+
+        def read():
+            try:
+                with self._new_seen_set('links') as seen, self.host_limiter.slot(url):
+                    self.rate_limiter.acquire(url)
+                    with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                        response.raise_for_status()
+
+                        # Only trust an explicit charset; otherwise let the parser sniff <meta>
+                        encoding = response.encoding if 'charset' in response.headers.get('Content-Type', '') else None
+                        anchors = self.extractor.iter_anchors_stream(
+                            response.iter_content(chunk_size=chunk_size), encoding)
+
+                        for link in self._iter_downloadable(anchors, url, seen):
+                            if not filter_extensions or link['extension'] in filter_extensions:
+                                found.put(link)
+
+            except requests.RequestException as e:
+                self._fetch_failed(url, e)
+            except Exception as e:
+                found.put(e)  # Raised in the consumer's thread
+            finally:
+                found.put(finished)
+
+        threading.Thread(target=read, daemon=True).start()
+
+        while True:
+            item = found.get()
+            if item is finished:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def _iter_downloadable(self,
+                           anchors: Iterable[Tuple[str, str]],
+                           url: str,
+                           seen) -> Iterator[Dict[str, str]]:
+        """
+        Turn (href, text) pairs into link dictionaries for downloadable files
+
+        Args:
+            anchors: Iterable of (href, text) pairs
+            url: URL of the page (used to resolve relative links)
+            seen: Seen-set from _new_seen_set; links already in it are skipped
+
+        Yields:
+            Link dictionaries, without duplicates
+        """
+
+        for href, text in anchors:
+            # Get link text
+            link_text = text or 'No description'
+
+            # Resolve and canonicalize URL, so variants of one file are only listed once
+            full_url = self.canonicalizer(href, base=url)
+
+            # Get extension
+            extension = self._get_extension(full_url)
+
+            # Only include downloadable files
+            if extension not in self.DOWNLOADABLE_EXTENSIONS:
+                continue
+
+            # Avoid duplicates
+            if not seen.add(full_url):
+                continue
+
+            yield {
+                'url': full_url,
+                'text': link_text,
+                'extension': extension
+            }
+
+    def _fetch_extracted(self, url: str, kind: str, extract: Callable) -> Any:
+        """
+        Fetch a page and return data extracted from it, using the page cache
+
+        When a page cache is configured and holds data of this kind for the URL,
+        a conditional GET is sent; on 304 the cached data is returned without
+        parsing anything.
+
+        Args:
+            url: URL to fetch
+            kind: Name of the extracted data (e.g. 'links', 'pagination')
+            extract: Function(response, url) returning JSON-serializable data
+
+        Returns:
+            Extracted data
+
+        Raises:
+            requests.RequestException: On HTTP or network errors
+        """
+        entry = self.page_cache.get(url) if self.page_cache else None
+
+        headers = {}
+        if entry and kind in entry['data']:
+            if entry['etag']:
+                headers['If-None-Match'] = entry['etag']
+            if entry['last_modified']:
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        with self.host_limiter.slot(url):
+            self.rate_limiter.acquire(url)
+            response = self.session.get(url, timeout=self.timeout, headers=headers)
+
+        if response.status_code == 304 and headers:
+            return entry['data'][kind]
+
+        response.raise_for_status()
+        result = extract(response, url)
+
+        if self.page_cache:
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+
+            # Keep other kinds of data only if they describe the same version of the page
+            data = {}
+            if entry and (etag or last_modified) and (entry['etag'], entry['last_modified']) == (etag, last_modified):
+                data = entry['data']
+            data[kind] = result
+
+            if etag or last_modified:
+                self.page_cache.put(url, etag, last_modified, data)
+
+        return result
 
     def scrape_multiple_pages(self,
                             base_pattern: str,
                             page_numbers: List[int],
-                            filter_extensions: Set[str] = None) -> List[Dict[str, str]]:
+                            filter_extensions: Set[str] = None,
+                            max_workers: int = None,
+                            on_page: Optional[Callable] = None) -> List[Dict[str, str]]:
         """
         Scrape multiple pages with pagination
 
+        Pages are fetched concurrently when more than one worker is configured.
+        The combined result is always ordered by page number.
+
         Args:
             base_pattern: URL pattern with {page} placeholder
                          Example: "https://example.com/docs/page/{page}"
             page_numbers: List of page numbers to scrape
             filter_extensions: Set of file extensions to filter
+            max_workers: Number of concurrent fetches (defaults to self.max_workers)
+            on_page: Optional callback function(page_url, links) run as each
+                     page is scraped, in completion order
 
         Returns:
             Combined list of all links from all pages
         """
-        all_links = []
+        workers = max(1, max_workers or self.max_workers)
+        page_numbers = sorted(page_numbers)
+        results = {}
+
+        if workers == 1:
+            for page_num in page_numbers:
+                url = base_pattern.format(page=page_num)
+                print(f"Scraping page {page_num}: {url}")
+
+                results[page_num] = self._scrape_page(url, filter_extensions)
+
+                print(f"  Found {len(results[page_num])} links")
+                if on_page:
+                    on_page(url, results[page_num])
+        else:
+            print(f"Scraping {len(page_numbers)} pages with {workers} workers")
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(self._scrape_page,
+                                    base_pattern.format(page=page_num),
+                                    filter_extensions): page_num
+                    for page_num in page_numbers
+                }
+                for future in as_completed(futures):
+                    page_num = futures[future]
+                    results[page_num] = future.result()
+                    print(f"Scraped page {page_num}: {base_pattern.format(page=page_num)}"
+                          f" - found {len(results[page_num])} links")
+                    if on_page:
+                        on_page(base_pattern.format(page=page_num), results[page_num])
+
+        all_links = (link for page_num in page_numbers for link in results[page_num])
 
-        for page_num in page_numbers:
-            url = base_pattern.format(page=page_num)
-            print(f"Scraping page {page_num}: {url}")
+        # Remove duplicates across pages
+        with self._new_seen_set('links') as seen:
+            return list(unique_links(all_links, seen))
 
-            links = self.scrape_page(url, filter_extensions)
-            all_links.extend(links)
+    def iter_multiple_pages(self,
+                            base_pattern: str,
+                            page_numbers: List[int],
+                            filter_extensions: Set[str] = None,
+                            max_workers: int = None) -> Iterator[Dict[str, str]]:
+        """
+        Scrape multiple pages, yielding each page's new links as soon as it is parsed
 
-            print(f"  Found {len(links)} links")
+        At most max_workers pages are in flight; the next page is only requested
+        once the links of a finished one have been consumed, so a slow consumer
+        (e.g. a download queue that is full) also slows down scraping.
 
-        # Remove duplicates across pages
-        seen = set()
-        unique_links = []
-        for link in all_links:
-            if link['url'] not in seen:
-                seen.add(link['url'])
-                unique_links.append(link)
+        Args:
+            base_pattern: URL pattern with {page} placeholder
+            page_numbers: List of page numbers to scrape
+            filter_extensions: Set of file extensions to filter
+            max_workers: Number of concurrent fetches (defaults to self.max_workers)
 
-        return unique_links
+        Yields:
+            Link dictionaries not seen on an earlier page, in page completion order
+        """
+        workers = max(1, max_workers or self.max_workers)
+        remaining = deque(sorted(page_numbers))
+
+        with self._new_seen_set('links') as seen, ThreadPoolExecutor(max_workers=workers) as executor:
+            running = {}
+            while remaining or running:
+                while remaining and len(running) < workers:
+                    page_url = base_pattern.format(page=remaining.popleft())
+                    running[executor.submit(self._scrape_page, page_url, filter_extensions)] = page_url
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page_url = running.pop(future)
+                    links = future.result()
+                    print(f"Scraped: {page_url} - found {len(links)} links")
+                    yield from unique_links(links, seen)
 
     def auto_detect_pagination(self, url: str) -> List[str]:
         """
@@ -143,38 +510,401 @@ class LinkScraper:
             List of discovered page URLs
         """
         try:
-            response = self.session.get(url, timeout=self.timeout)
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.content, 'html.parser')
             page_urls = set([url])
-
-            # Look for common pagination patterns
-            pagination_selectors = [
-                '.pagination a',
-                '.pager a',
-                'nav a',
-                'a[rel="next"]',
-                'a[rel="prev"]',
-                'a.page-link',
-                'a.page-numbers'
-            ]
-
-            for selector in pagination_selectors:
-                for link in soup.select(selector):
-                    href = link.get('href')
-                    if href:
-                        full_url = urljoin(url, href)
-                        # Only add if it looks like a page URL (contains digits)
-                        if re.search(r'/page/\d+|[\?&]page=\d+|\d+/?$', full_url):
-                            page_urls.add(full_url)
-
+            page_urls.update(self._filter_page_urls(self._fetch_document(url), self._listing_scope(url)))
             return sorted(list(page_urls))
 
         except requests.RequestException as e:
-            print(f"Error detecting pagination: {e}")
+            self._fetch_failed(url, e)
             return [url]
 
+    def _filter_page_urls(self, document: Dict[str, List], in_scope: Callable[[str], bool]) -> List[str]:
+        """
+        Keep the pagination links that belong to the listing's page sequence
+
+        Args:
+            document: Document returned by _fetch_document
+            in_scope: Check from _listing_scope; other links are never pages of the listing
+
+        Returns:
+            Page URLs matching the inferred {page} template, or matching the
+            loose page-URL check when no template could be inferred
+        """
+        candidates = [page_url for page_url in document['pagination'] + document['next'] if in_scope(page_url)]
+        inferred = infer_page_template(candidates)
+        if inferred:
+            pattern = template_regex(inferred[0])
+            return [page_url for page_url in candidates if pattern.match(page_url)]
+
+        # Only add if it looks like a page URL (contains digits)
+        return [page_url for page_url in candidates if PAGE_URL_RE.search(page_url)]
+
+    def crawl_pagination(self,
+                         url: str,
+                         filter_extensions: Set[str] = None,
+                         max_pages: int = 500,
+                         on_page: Optional[Callable] = None) -> List[Dict[str, str]]:
+        """
+        Scrape a paginated listing, discovering pages while extracting links
+
+        Each page is fetched and parsed once: its downloadable links and its
+        pagination links come from the same document, and no URL is fetched
+        twice. When a {page} template can be inferred from the seed page's
+        navigation, the last page is found by probing past the highest visible
+        number, and the whole range is then fetched concurrently up front.
+        Otherwise the numbered pagination links of the seed page are fetched,
+        and from there only rel="next" links are followed until none are left.
+
+        Args:
+            url: First page of the listing
+            filter_extensions: Set of file extensions to filter
+            max_pages: Maximum number of pages to fetch
+            on_page: Optional callback function(page_url, links) run as each
+                     page of the listing is scraped
+
+        Returns:
+            Combined list of links from all pages, in page order
+        """
+        def page_links(document):
+            return [link for link in document['links']
+                    if not filter_extensions or link['extension'] in filter_extensions]
+
+        def report(page_url, document):
+            if on_page and document is not None:
+                on_page(page_url, page_links(document))
+
+        documents = dict(self._fetch_documents([url]))
+        seed = documents[url]
+        if seed is None:
+            return []
+        report(url, seed)
+
+        in_scope = self._listing_scope(url)
+        inferred = infer_page_template([page_url for page_url in seed['pagination'] + seed['next']
+                                        if in_scope(page_url)])
+        if inferred:
+            template, highest = inferred
+            last_page = self.find_last_page(template, highest, max_pages, documents)
+            print(f"Detected page template {template} with {last_page} pages")
+
+            # The seed is page 1 unless it is itself a numbered page
+            first = 1 if template_regex(template).match(url) else 2
+            page_urls = [url] + [template.format(page=n) for n in range(first, last_page + 1)]
+            page_urls = list(dict.fromkeys(page_urls))[:max_pages]
+
+            # Pages fetched while probing for the last one
+            for page_url in page_urls[1:]:
+                if page_url in documents:
+                    report(page_url, documents[page_url])
+
+            missing = [page_url for page_url in page_urls if page_url not in documents]
+            for page_url, document in self._fetch_documents(missing):
+                documents[page_url] = document
+                if document is not None:
+                    print(f"Scraped: {page_url} - found {len(document['links'])} links")
+                report(page_url, document)
+        else:
+            page_urls = self._follow_pagination(url, documents, max_pages, report)
+
+        pages = [documents[page_url] for page_url in page_urls if documents.get(page_url)]
+        print(f"Scraped {len(pages)} pages")
+
+        all_links = (link for document in pages for link in page_links(document))
+
+        # Remove duplicates across pages
+        with self._new_seen_set('links') as seen:
+            return list(unique_links(all_links, seen))
+
+    def _follow_pagination(self,
+                           url: str,
+                           documents: Dict[str, Optional[Dict[str, List]]],
+                           max_pages: int,
+                           on_page: Optional[Callable] = None) -> List[str]:
+        """
+        Follow pagination without a {page} template
+
+        The seed's numbered pagination links are only read once: the loose
+        page-URL check also matches unrelated numeric links (e.g. "/2024/" in
+        a site menu), so later pages only contribute their rel="next" links.
+        Every page must stay on the listing's host and path (_listing_scope).
+
+        Args:
+            url: First page (already in documents)
+            documents: Fetched documents by URL, extended in place
+            max_pages: Maximum number of pages to fetch
+            on_page: Optional callback function(page_url, document) run for
+                     each page fetched
+
+        Returns:
+            Page URLs in discovery order
+        """
+        order = [url]
+        frontier = [url]
+        in_scope = self._listing_scope(url)
+
+        while frontier:
+            next_frontier = []
+            for page_url in frontier:
+                document = documents.get(page_url)
+                if document is None:
+                    continue
+                if page_url == url:
+                    next_urls = self._filter_page_urls(document, in_scope)
+                else:
+                    next_urls = [next_url for next_url in document['next'] if in_scope(next_url)]
+                for next_url in next_urls:
+                    if next_url not in documents and next_url not in next_frontier:
+                        next_frontier.append(next_url)
+
+            next_frontier = next_frontier[:max_pages - len(order)]
+            for page_url, document in self._fetch_documents(next_frontier):
+                documents[page_url] = document
+                if document is not None:
+                    print(f"Scraped: {page_url} - found {len(document['links'])} links")
+                if on_page:
+                    on_page(page_url, document)
+
+            order.extend(next_frontier)
+            frontier = next_frontier
+
+        return order
+
+    def find_last_page(self,
+                       template: str,
+                       highest_visible: int,
+                       max_pages: int = 500,
+                       documents: Optional[Dict[str, Optional[Dict[str, List]]]] = None) -> int:
+        """
+        Find the last page of a listing by probing past the highest visible number
+
+        The highest linked page is confirmed first, then page numbers are
+        probed with exponentially growing steps (galloping) until a page is
+        missing (error status or no downloadable links), and the boundary is
+        narrowed down with a binary search.
+
+        Args:
+            template: URL template with a {page} placeholder
+            highest_visible: Highest page number linked from the navigation
+            max_pages: Upper bound for the page number
+            documents: Optional dict of fetched documents by URL; probed pages
+                       are added so they are not fetched again
+
+        Returns:
+            Number of the last existing page (at least 1)
+        """
+        if documents is None:
+            documents = {}
+
+        def exists(page: int) -> bool:
+            page_url = template.format(page=page)
+            if page_url not in documents:
+                try:
+                    documents[page_url] = self._fetch_document(page_url)
+                except requests.RequestException:
+                    documents[page_url] = None
+            document = documents[page_url]
+            return bool(document and document['links'])
+
+        low = min(max(highest_visible, 1), max_pages)
+        while low > 1 and not exists(low):
+            # The navigation promised more pages than there are; step back
+            low //= 2
+
+        # Gallop forward until a page is missing
+        step = 1
+        high = None
+        while low < max_pages:
+            probe = min(low + step, max_pages)
+            if exists(probe):
+                low = probe
+                step *= 2
+            else:
+                high = probe
+                break
+
+        # Binary search between the last page found and the first missing one
+        while high is not None and high - low > 1:
+            middle = (low + high) // 2
+            if exists(middle):
+                low = middle
+            else:
+                high = middle
+
+        return low
+
+    def crawl_site(self,
+                   url: str,
+                   filter_extensions: Set[str] = None,
+                   max_depth: int = 2,
+                   max_pages: int = 200,
+                   scope: str = 'domain',
+                   on_page: Optional[Callable] = None) -> Iterator[Dict[str, str]]:
+        """
+        Crawl a site breadth-first from a seed page, yielding links as they are found
+
+        Pages are fetched by a pool of max_workers threads. Every page URL is
+        queued at most once, and only pages inside the crawl scope are followed.
+        Downloadable links are yielded as soon as the page holding them has
+        been parsed, so the order follows the crawl rather than the site.
+
+        Args:
+            url: Seed URL
+            filter_extensions: Set of file extensions to filter
+            max_depth: Maximum number of links followed from the seed (0 = seed only)
+            max_pages: Maximum number of pages to fetch
+            scope: 'domain' to stay on the seed's host, or 'path' to also stay
+                   below the seed's directory
+            on_page: Optional callback function(page_url, links) run with the
+                     new links of each crawled page before they are yielded
+
+        Yields:
+            Link dictionaries: {'url': str, 'text': str, 'extension': str}
+        """
+        if scope not in ('domain', 'path'):
+            raise ValueError(f"Unknown crawl scope '{scope}' (choose from domain, path)")
+
+        url = self.canonicalizer(url)
+        in_scope = self._crawl_scope(url, scope)
+
+        queued = self._new_seen_set('pages', persistent=False)
+        queued.add(url)
+        queued_count = 1
+        frontier = deque([(url, 0)])
+        seen_links = self._new_seen_set('links')
+        fetched = 0
+
+        def fetch(page_url):
+            try:
+                return self._fetch_document(page_url)
+            except requests.RequestException as e:
+                self._fetch_failed(page_url, e)
+                return None
+
+        with queued, seen_links, ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            running = {}
+
+            while frontier or running:
+                # Keep the pool busy; the frontier is FIFO so pages go out in depth order
+                while frontier and len(running) < self.max_workers:
+                    page_url, depth = frontier.popleft()
+                    running[executor.submit(fetch, page_url)] = (page_url, depth)
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    page_url, depth = running.pop(future)
+                    document = future.result()
+                    if document is None:
+                        continue
+
+                    fetched += 1
+                    print(f"Crawled: {page_url} (depth {depth}) - found {len(document['links'])} links")
+
+                    new_links = [link for link in document['links']
+                                 if (not filter_extensions or link['extension'] in filter_extensions)
+                                 and seen_links.add(link['url'])]
+                    if on_page:
+                        on_page(page_url, new_links)
+                    yield from new_links
+
+                    if depth >= max_depth:
+                        continue
+                    for next_url in document['pages']:
+                        if queued_count >= max_pages:
+                            break
+                        if in_scope(next_url) and queued.add(next_url):
+                            queued_count += 1
+                            frontier.append((next_url, depth + 1))
+
+        print(f"Crawled {fetched} pages")
+
+    def _new_seen_set(self, name: str, persistent: bool = True):
+        """
+        Create a seen-set with the configured backend
+
+        Args:
+            name: Purpose of the set ('links', 'pages'); used as table name
+                  by the SQLite backend
+            persistent: False to never reuse an on-disk set from earlier runs
+
+        Returns:
+            Seen-set instance (use it as a context manager to release it)
+        """
+        options = dict(self.seen_options)
+        if self.seen_backend == 'sqlite':
+            options['name'] = name
+            if not persistent:
+                options.pop('path', None)
+        return make_seen_set(self.seen_backend, **options)
+
+    def _listing_scope(self, url: str) -> Callable[[str], bool]:
+        """
+        Build the check deciding whether a URL can be a page of the listing at url
+
+        Pages must be on the seed's host, below the seed's directory once a
+        trailing page number is dropped ("/docs/page/3/" -> "/docs/").
+        """
+        parsed = urlparse(url)
+        listing_path = PAGE_PATH_SUFFIX_RE.sub('/', parsed.path)
+        return self._crawl_scope(urlunparse(parsed._replace(path=listing_path)), 'path')
+
+    @staticmethod
+    def _crawl_scope(url: str, scope: str) -> Callable[[str], bool]:
+        """
+        Build the check deciding whether a page belongs to a crawl
+
+        Args:
+            url: Seed URL
+            scope: 'domain' or 'path' (see crawl_site)
+
+        Returns:
+            Function taking a URL and returning True if it should be crawled
+        """
+        seed = urlparse(url)
+        host = seed.hostname or ''
+        host = host[4:] if host.startswith('www.') else host
+        prefix = seed.path.rsplit('/', 1)[0] + '/'
+
+        def in_scope(candidate: str) -> bool:
+            parsed = urlparse(candidate)
+            candidate_host = parsed.hostname or ''
+            if candidate_host.startswith('www.'):
+                candidate_host = candidate_host[4:]
+            if candidate_host != host:
+                return False
+            return scope == 'domain' or (parsed.path or '/').startswith(prefix)
+
+        return in_scope
+
+    def _fetch_documents(self, urls: List[str]) -> List[Tuple[str, Optional[Dict[str, List]]]]:
+        """
+        Fetch several pages, concurrently when more than one worker is configured
+
+        Args:
+            urls: URLs to fetch
+
+        Returns:
+            List of (url, document) pairs in the order of urls; document is
+            None if the page could not be fetched
+        """
+        def fetch(page_url):
+            try:
+                return self._fetch_document(page_url)
+            except requests.RequestException as e:
+                self._fetch_failed(page_url, e)
+                return None
+
+        if self.max_workers == 1 or len(urls) == 1:
+            return [(page_url, fetch(page_url)) for page_url in urls]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            return list(zip(urls, executor.map(fetch, urls)))
+
+    def _fetch_failed(self, url: str, error: Exception):
+        """Report a page that could not be fetched and count it in fetch_errors"""
+        print(f"Error scraping {url}: {error}")
+        with self._errors_lock:
+            self.fetch_errors += 1
+
     def _get_extension(self, url: str) -> str:
         """
         Extract file extension from URL
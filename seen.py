@@ -0,0 +1,282 @@
+"""
+Seen-URL sets used for de-duplication
+
+Every place that drops repeated links or pages goes through one of these sets
+instead of building its own Python set. The backends trade memory for
+exactness:
+
+- MemorySeenSet keeps the full URL strings (exact, largest)
+- HashedSeenSet keeps fixed-size digests (exact up to hash collisions)
+- BloomSeenSet keeps a bit array sized for a false-positive rate (smallest;
+  an unseen URL is occasionally reported as seen)
+- SQLiteSeenSet keeps digests on disk, optionally across runs
+"""
+
+import os
+import math
+import sqlite3
+import hashlib
+import tempfile
+import threading
+from typing import Dict, Iterable, Iterator, Optional
+
+
+def _digest(url: str, size: int) -> bytes:
+    return hashlib.blake2b(url.encode('utf-8'), digest_size=size).digest()
+
+
+class MemorySeenSet:
+    """Exact seen-set holding the URLs themselves"""
+
+    def __init__(self):
+        self._items = set()
+
+    def add(self, url: str) -> bool:
+        """
+        Mark a URL as seen
+
+        Args:
+            url: URL to add
+
+        Returns:
+            True if the URL had not been seen before
+        """
+        if url in self._items:
+            return False
+        self._items.add(url)
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def close(self):
+        """Release the set's resources"""
+        self._items = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HashedSeenSet(MemorySeenSet):
+    """Seen-set holding fixed-size BLAKE2b digests instead of full URLs"""
+
+    def __init__(self, digest_size: int = 8):
+        """
+        Initialize set
+
+        Args:
+            digest_size: Bytes kept per URL; 8 bytes make a collision unlikely
+                         below billions of URLs
+        """
+        super().__init__()
+        self.digest_size = digest_size
+
+    def add(self, url: str) -> bool:
+        return super().add(_digest(url, self.digest_size))
+
+    def __contains__(self, url: str) -> bool:
+        return _digest(url, self.digest_size) in self._items
+
+
+class BloomSeenSet:
+    """Bloom filter seen-set with a configurable false-positive rate"""
+
+    def __init__(self, capacity: int = 1000000, error_rate: float = 0.001):
+        """
+        Initialize filter
+
+        Args:
+            capacity: Number of URLs the filter is sized for
+            error_rate: False-positive rate reached at capacity
+        """
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate must be between 0 and 1")
+
+        self.capacity = max(1, capacity)
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / self.capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def _positions(self, url: str) -> Iterator[int]:
+        # Double hashing: k positions derived from two 64-bit halves of one digest
+        digest = _digest(url, 16)
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, url: str) -> bool:
+        """
+        Mark a URL as seen
+
+        Args:
+            url: URL to add
+
+        Returns:
+            True if the URL had not been seen before (False may be a false positive)
+        """
+        added = False
+        with self._lock:
+            for position in self._positions(url):
+                byte, bit = divmod(position, 8)
+                if not self._bits[byte] & (1 << bit):
+                    self._bits[byte] |= 1 << bit
+                    added = True
+            if added:
+                self._count += 1
+        return added
+
+    def __contains__(self, url: str) -> bool:
+        return all(self._bits[position // 8] & (1 << position % 8) for position in self._positions(url))
+
+    def __len__(self) -> int:
+        # Number of URLs added, not counting those rejected as (possibly false) repeats
+        return self._count
+
+    def close(self):
+        """Release the set's resources"""
+        self._bits = bytearray(len(self._bits))
+        self._count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SQLiteSeenSet:
+    """Seen-set stored in SQLite, persistent when given a path"""
+
+    COMMIT_EVERY = 1000
+
+    def __init__(self, path: Optional[str] = None, name: str = 'seen', digest_size: int = 16):
+        """
+        Open (or create) the set
+
+        Args:
+            path: SQLite file; None uses a temporary file removed on close
+            name: Table name, so one file can hold several sets
+            digest_size: Bytes of BLAKE2b digest stored per URL
+        """
+        if not name.isidentifier():
+            raise ValueError(f"Invalid seen-set name '{name}'")
+
+        self.temporary = path is None
+        if self.temporary:
+            fd, path = tempfile.mkstemp(prefix='seen-', suffix='.sqlite')
+            os.close(fd)
+        else:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        self.path = path
+        self.name = name
+        self.digest_size = digest_size
+        self._lock = threading.Lock()
+        self._pending = 0
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        if self.temporary:
+            self._conn.execute("PRAGMA journal_mode = OFF")
+            self._conn.execute("PRAGMA synchronous = OFF")
+        self._conn.execute(f"CREATE TABLE IF NOT EXISTS {name} (digest BLOB PRIMARY KEY) WITHOUT ROWID")
+        self._conn.commit()
+
+    def add(self, url: str) -> bool:
+        """
+        Mark a URL as seen
+
+        Args:
+            url: URL to add
+
+        Returns:
+            True if the URL had not been seen before
+        """
+        with self._lock:
+            cursor = self._conn.execute(f"INSERT OR IGNORE INTO {self.name} (digest) VALUES (?)",
+                                        (_digest(url, self.digest_size),))
+
+            # Commit in batches; one transaction per URL would dominate large crawls
+            self._pending += 1
+            if self._pending >= self.COMMIT_EVERY:
+                self._conn.commit()
+                self._pending = 0
+        return cursor.rowcount == 1
+
+    def __contains__(self, url: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(f"SELECT 1 FROM {self.name} WHERE digest = ?",
+                                     (_digest(url, self.digest_size),)).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.name}").fetchone()[0]
+
+    def close(self):
+        """Close the database, removing it if it was temporary"""
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+        if self.temporary and os.path.exists(self.path):
+            os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+SEEN_BACKENDS = {
+    'memory': MemorySeenSet,
+    'hashed': HashedSeenSet,
+    'bloom': BloomSeenSet,
+    'sqlite': SQLiteSeenSet,
+}
+
+
+def make_seen_set(backend: str = 'memory', **options):
+    """
+    Create a seen-set
+
+    Args:
+        backend: 'memory', 'hashed', 'bloom' or 'sqlite'
+        **options: Passed to the backend (e.g. error_rate for 'bloom',
+                   path and name for 'sqlite')
+
+    Returns:
+        Seen-set instance
+    """
+    if backend not in SEEN_BACKENDS:
+        raise ValueError(f"Unknown seen-set backend '{backend}' (choose from {', '.join(SEEN_BACKENDS)})")
+    return SEEN_BACKENDS[backend](**options)
+
+
+def unique_links(links: Iterable[Dict[str, str]], seen=None) -> Iterator[Dict[str, str]]:
+    """
+    Drop links whose URL was already seen
+
+    Args:
+        links: Iterable of link dictionaries
+        seen: Seen-set to use (defaults to a fresh MemorySeenSet)
+
+    Yields:
+        Link dictionaries with a URL not seen before, in their original order
+    """
+    if seen is None:
+        seen = MemorySeenSet()
+    for link in links:
+        if seen.add(link['url']):
+            yield link
@@ -0,0 +1,161 @@
+"""
+Throttling helpers shared by the scraper and the downloader
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+from typing import Dict, Iterable, Optional
+
+
+class HostConnectionLimiter:
+    """Caps the number of concurrent connections opened to each host"""
+
+    def __init__(self, max_per_host: int = 4):
+        """
+        Initialize limiter
+
+        Args:
+            max_per_host: Maximum number of simultaneous requests per host
+        """
+        self.max_per_host = max(1, max_per_host)
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.max_per_host)
+                self._semaphores[host] = semaphore
+            return semaphore
+
+    @contextmanager
+    def slot(self, url: str):
+        """
+        Hold one connection slot for the host of a URL
+
+        Args:
+            url: URL about to be requested
+        """
+        semaphore = self._semaphore(urlparse(url).netloc.lower())
+        semaphore.acquire()
+        try:
+            yield
+        finally:
+            semaphore.release()
+
+    @contextmanager
+    def spare_slots(self, url: str, wanted: int):
+        """
+        Hold up to `wanted` more connection slots for the host of a URL, without waiting
+
+        Yields:
+            Number of slots obtained (0 when the host is already at its cap)
+        """
+        semaphore = self._semaphore(urlparse(url).netloc.lower())
+        taken = 0
+        while taken < wanted and semaphore.acquire(blocking=False):
+            taken += 1
+        try:
+            yield taken
+        finally:
+            for _ in range(taken):
+                semaphore.release()
+
+
+class _TokenBucket:
+    """Token bucket for a single host"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token and return how long the caller must wait for it"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
+
+
+class RateLimiter:
+    """Thread-safe per-host token-bucket rate limiter"""
+
+    def __init__(self,
+                 rate: Optional[float] = None,
+                 burst: float = 1,
+                 host_rates: Optional[Dict[str, float]] = None):
+        """
+        Initialize limiter
+
+        Args:
+            rate: Default requests per second allowed for each host (None = unlimited)
+            burst: Number of requests a host may receive back-to-back
+            host_rates: Per-host overrides, e.g. {'example.com': 10, 'slow.org': 2}
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.host_rates = {host.lower(): r for host, r in (host_rates or {}).items()}
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _rate_for(self, host: str) -> Optional[float]:
+        if host in self.host_rates:
+            return self.host_rates[host]
+        if host.startswith('www.') and host[4:] in self.host_rates:
+            return self.host_rates[host[4:]]
+        return self.rate
+
+    def _bucket(self, host: str) -> Optional[_TokenBucket]:
+        with self._lock:
+            if host not in self._buckets:
+                rate = self._rate_for(host)
+                self._buckets[host] = _TokenBucket(rate, self.burst) if rate and rate > 0 else None
+            return self._buckets[host]
+
+    def acquire(self, url: str) -> float:
+        """
+        Block until a request to the host of a URL is allowed
+
+        Args:
+            url: URL about to be requested
+
+        Returns:
+            Number of seconds spent waiting
+        """
+        bucket = self._bucket((urlparse(url).hostname or '').lower())
+        if bucket is None:
+            return 0.0
+
+        wait = bucket.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+def parse_host_rates(values: Iterable[str]) -> Dict[str, float]:
+    """
+    Parse per-host rate specifications
+
+    Args:
+        values: Strings like "example.com=10"
+
+    Returns:
+        Dictionary mapping host to requests per second
+    """
+    host_rates = {}
+    for value in values or []:
+        host, _, rate = value.partition('=')
+        if not host.strip() or not rate.strip():
+            raise ValueError(f"Invalid host rate '{value}' (expected HOST=RATE)")
+        host_rates[host.strip().lower()] = float(rate)
+    return host_rates
@@ -0,0 +1,157 @@
+"""
+URL canonicalization
+
+Links to the same file often differ only in tracking parameters, query order,
+fragments, default ports, host aliases or percent-encoding. Reducing every URL
+to one canonical form at extraction time lets the scraper, the downloader and
+the manifest treat those variants as the same file.
+"""
+
+import re
+from urllib.parse import quote, unquote_plus, urljoin, urlsplit, urlunsplit
+from typing import Dict, Iterable, Optional
+
+
+# Query parameters that only track where a click came from
+DEFAULT_STRIP_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid',
+    'mc_cid', 'mc_eid', '_ga', '_gl',
+}
+DEFAULT_STRIP_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# RFC 3986 unreserved characters never need percent-encoding
+_UNRESERVED = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-._~')
+_PERCENT_ESCAPE = re.compile(r'%([0-9A-Fa-f]{2})')
+_PATH_SAFE = "/:@!$&'()*+,;=-._~%"
+
+
+def _normalize_escapes(text: str) -> str:
+    """Decode escaped unreserved characters, uppercase other escapes and escape unsafe ones"""
+    def fix(match):
+        char = chr(int(match.group(1), 16))
+        return char if char in _UNRESERVED else '%' + match.group(1).upper()
+
+    text = _PERCENT_ESCAPE.sub(fix, text)
+    # Escape what is left (spaces, non-ASCII); existing escapes are kept as they are
+    return quote(text, safe=_PATH_SAFE)
+
+
+class URLCanonicalizer:
+    """Reduces URLs to a canonical form"""
+
+    def __init__(self,
+                 host_aliases: Optional[Dict[str, str]] = None,
+                 strip_params: Iterable[str] = DEFAULT_STRIP_PARAMS,
+                 strip_prefixes: Iterable[str] = DEFAULT_STRIP_PREFIXES,
+                 sort_query: bool = True,
+                 remove_fragment: bool = True):
+        """
+        Initialize canonicalizer
+
+        Args:
+            host_aliases: Mapping of alias host to canonical host, e.g.
+                          {'example.com': 'www.example.com'}. The target may
+                          include a path prefix ('www.example.com/files'),
+                          which is put in front of the aliased URL's path.
+            strip_params: Query parameter names removed from every URL
+            strip_prefixes: Query parameter name prefixes removed from every URL
+            sort_query: Sort query parameters by name
+            remove_fragment: Drop the #fragment
+        """
+        self.host_aliases = {host.lower(): target for host, target in (host_aliases or {}).items()}
+        self.strip_params = {param.lower() for param in strip_params}
+        self.strip_prefixes = tuple(prefix.lower() for prefix in strip_prefixes)
+        self.sort_query = sort_query
+        self.remove_fragment = remove_fragment
+
+    def canonicalize(self, url: str, base: Optional[str] = None) -> str:
+        """
+        Canonicalize a URL
+
+        Args:
+            url: Absolute URL, or URL relative to base
+            base: URL that relative URLs are resolved against
+
+        Returns:
+            Canonical URL; URLs that are not http(s) are only stripped of whitespace
+        """
+        url = url.strip()
+        if base:
+            url = urljoin(base, url)
+
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+        if scheme not in DEFAULT_PORTS:
+            return url
+
+        host = (parts.hostname or '').rstrip('.')
+        path = parts.path
+
+        target = self.host_aliases.get(host)
+        if target:
+            host, _, prefix = target.partition('/')
+            if prefix:
+                path = '/' + prefix.strip('/') + (path if path.startswith('/') else '/' + path)
+
+        netloc = f'[{host}]' if ':' in host else host
+        if parts.username is not None:
+            userinfo = parts.username + (f':{parts.password}' if parts.password is not None else '')
+            netloc = f'{userinfo}@{netloc}'
+        try:
+            port = parts.port
+        except ValueError:
+            port = None
+        if port is not None and port != DEFAULT_PORTS[scheme]:
+            netloc = f'{netloc}:{port}'
+
+        path = _normalize_escapes(path) or '/'
+        query = self._canonical_query(parts.query)
+        fragment = '' if self.remove_fragment else parts.fragment
+
+        return urlunsplit((scheme, netloc, path, query, fragment))
+
+    __call__ = canonicalize
+
+    def _canonical_query(self, query: str) -> str:
+        """
+        Drop tracking parameters and sort the rest by name
+
+        Each parameter keeps its original text, since the canonical URL is the
+        one requested: bare flags ("?download") stay without "=", and "+" or
+        percent-escapes are not re-encoded.
+        """
+        if not query:
+            return ''
+
+        params = []
+        for param in query.split('&'):
+            if not param:
+                continue
+            name = unquote_plus(param.split('=', 1)[0])
+            if name.lower() in self.strip_params or name.lower().startswith(self.strip_prefixes):
+                continue
+            params.append((name, param))
+
+        if self.sort_query:
+            # Stable sort keeps the order of repeated parameters
+            params.sort(key=lambda param: param[0])
+        return '&'.join(text for _, text in params)
+
+
+DEFAULT_CANONICALIZER = URLCanonicalizer()
+
+
+def canonicalize_url(url: str, base: Optional[str] = None) -> str:
+    """
+    Canonicalize a URL with the default settings (no host aliases)
+
+    Args:
+        url: Absolute URL, or URL relative to base
+        base: URL that relative URLs are resolved against
+
+    Returns:
+        Canonical URL
+    """
+    return DEFAULT_CANONICALIZER.canonicalize(url, base)